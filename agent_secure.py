@@ -1,8 +1,16 @@
 # agent_secure.py - 安全加固版 Agent
 from langchain_ollama import ChatOllama
 from langchain.agents import create_agent
+import ast
+import asyncio
+import itertools
+import logging
+import math
 import os
+import secrets
 import sys
+import threading
+from functools import lru_cache
 
 # 添加 src 目录到 Python 路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -11,13 +19,13 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from config import Config
 from common.logs import Logger
 from common.memory import ConversationMemory
-from security.security import SecurityValidator
+from security.security import SecurityValidator, SecurityConfig
 from agents.tool_manager import get_tool_manager
 
 # 导入新功能模块
 from core.prompts import get_prompt_manager
-from core.data_loaders import load_documents
-from core.vector_store import InMemoryVectorStore, RAGSystem
+from core.data_loaders import load_documents, data_loader_manager, DocumentCache
+from core.vector_store import InMemoryVectorStore, RAGSystem, SimpleEmbedding, create_query_cache
 from core.output_parsers import parse_output
 from common.utilities import (
     MathUtils, DateUtils, FileUtils, SystemUtils,
@@ -25,6 +33,83 @@ from common.utilities import (
 )
 
 
+# !math 允许的 AST 节点类型（按具体类型做集合查找）
+_ALLOWED_MATH_NODES = frozenset(
+    getattr(ast, name) for name in (
+        'Expression', 'BinOp', 'UnaryOp',
+        'Add', 'Sub', 'Mult', 'Div', 'FloorDiv', 'Mod', 'Pow', 'UAdd', 'USub',
+        'Name', 'Load', 'Call', 'Constant',
+        'Num', 'NameConstant'  # 兼容旧版本 Python
+    ) if hasattr(ast, name)
+)
+
+# !math 可以使用的函数和常量（求值时不提供任何内置函数，只能使用这里列出的名称）
+_MATH_NAMESPACE = {
+    "abs": abs, "round": round, "min": min, "max": max, "pow": pow,
+    **{name: getattr(math, name) for name in (
+        "sqrt", "exp", "log", "log2", "log10",
+        "sin", "cos", "tan", "asin", "acos", "atan",
+        "floor", "ceil", "factorial", "gcd", "pi", "e"
+    )}
+}
+_MATH_GLOBALS = {"__builtins__": {}, **_MATH_NAMESPACE}
+
+# 工具调用 ID：进程内随机前缀 + 递增序号，保存后再加载的历史也不会与新 ID 冲突
+_TOOL_CALL_ID_PREFIX = f"tool_{secrets.token_hex(4)}_"
+_tool_call_counter = itertools.count(1)
+
+
+@lru_cache(maxsize=256)
+def compile_math_expression(expression: str):
+    """解析并校验数学表达式，返回编译后的代码对象（带缓存）
+
+    校验通过的语法树直接编译，求值时无需再次解析表达式文本。
+
+    Args:
+        expression: 数学表达式
+
+    Returns:
+        编译后的代码对象；包含不允许的节点或未知名称时返回 None
+
+    Raises:
+        SyntaxError: 表达式语法错误
+    """
+    tree = ast.parse(expression, mode='eval')
+    for node in ast.walk(tree):
+        if type(node) not in _ALLOWED_MATH_NODES:
+            return None
+        if isinstance(node, ast.Name) and node.id not in _MATH_NAMESPACE:
+            return None
+    return compile(tree, '<math>', 'eval')
+
+
+@lru_cache(maxsize=4096)
+def _validate_user_input_memo(user_input: str) -> tuple:
+    """用户输入验证结果缓存（以完整字符串为键，不会出现哈希碰撞误判）"""
+    return SecurityValidator.validate_user_input(user_input)
+
+
+# 安全配置重新加载后旧的验证结果可能失效
+SecurityConfig.on_reload(_validate_user_input_memo.cache_clear)
+
+
+def validate_user_input_cached(user_input: str) -> tuple:
+    """带缓存的用户输入验证
+
+    验证结果只取决于输入文本和安全配置，重复输入（重试、相同提问）直接命中缓存。
+    超长输入在长度检查处即被拒绝，不进入缓存，因此缓存键长度有上限。
+
+    Args:
+        user_input: 用户输入
+
+    Returns:
+        tuple: (是否安全, 错误信息)
+    """
+    if len(user_input) > SecurityValidator._get_max_input_length():
+        return SecurityValidator.validate_user_input(user_input)
+    return _validate_user_input_memo(user_input)
+
+
 def parse_tool_call_safely(content: str) -> tuple:
     """安全地解析工具调用
 
@@ -50,18 +135,133 @@ def parse_tool_call_safely(content: str) -> tuple:
         return False, None, None, f"解析失败: {str(e)}"
 
 
+def looks_like_tool_call(content: str) -> bool:
+    """判断消息内容是否像 JSON 工具调用
+
+    先检查开头字符（无需复制字符串），再做子串查找。
+
+    Args:
+        content: 消息内容
+
+    Returns:
+        bool: 是否像工具调用
+    """
+    return content.lstrip().startswith('{') or '```json' in content
+
+
+def get_new_messages(messages: list, sent_count: int) -> list:
+    """获取 agent 本轮新产生的消息
+
+    agent 返回的消息列表包含本次传入的历史消息，只需检查其后追加的部分。
+
+    Args:
+        messages: agent 返回的全部消息
+        sent_count: 本次传入的消息数
+
+    Returns:
+        list: 新消息列表（无法区分时返回全部消息）
+    """
+    return messages[sent_count:] if len(messages) > sent_count else messages
+
+
+async def stream_final_response(agent, inputs: dict) -> str:
+    """流式获取工具执行后的最终响应
+
+    逐块打印模型输出；以 "{" 开头的消息视为工具调用，不直接显示。
+
+    Args:
+        agent: Agent 实例
+        inputs: Agent 输入
+
+    Returns:
+        str: 最后一条非工具调用的 AI 消息内容（没有则为空字符串）
+    """
+    final_content = ""
+    message_id = None
+    parts = []
+    live = None  # None: 尚未判断；True: 正在实时打印；False: 静默缓冲
+
+    def finish_message():
+        nonlocal final_content
+        content = "".join(parts)
+        if content and not looks_like_tool_call(content):
+            if not live:
+                print("\n" + content, end="")
+            final_content = content
+
+    async for chunk, _ in agent.astream(inputs, stream_mode="messages"):
+        if getattr(chunk, "type", None) != "AIMessageChunk":
+            continue
+        text = chunk.content if isinstance(chunk.content, str) else ""
+        if not text:
+            continue
+
+        if chunk.id != message_id:
+            if parts:
+                finish_message()
+            message_id, parts, live = chunk.id, [], None
+        parts.append(text)
+
+        if live is None:
+            head = "".join(parts).lstrip()
+            if not head:
+                continue
+            live = not head.startswith('{')
+            if live:
+                print("\n" + "".join(parts), end="", flush=True)
+        elif live:
+            print(text, end="", flush=True)
+
+    if parts:
+        finish_message()
+    if final_content:
+        print()
+    return final_content
+
+
 def generate_tool_call_id() -> str:
     """生成唯一的工具调用 ID
 
     Returns:
         str: 工具调用 ID
     """
-    import time
-    import random
-    return f"tool_{int(time.time() * 1000)}_{random.randint(1000, 9999)}"
+    return f"{_TOOL_CALL_ID_PREFIX}{next(_tool_call_counter)}"
+
+
+async def read_user_input(prompt: str) -> str:
+    """在守护线程中读取一行用户输入，不阻塞事件循环
+
+    不使用 asyncio.to_thread：默认线程池的线程阻塞在 input() 上时，
+    Ctrl+C 后 asyncio.run 会一直等待它结束而无法退出。
+
+    Args:
+        prompt: 输入提示符
+
+    Returns:
+        str: 用户输入的一行文本
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def _deliver(setter, value):
+        if not future.done():  # 等待方可能已被取消
+            setter(value)
+
+    def _worker():
+        try:
+            setter, value = future.set_result, input(prompt)
+        except BaseException as e:
+            setter, value = future.set_exception, e
+        try:
+            loop.call_soon_threadsafe(_deliver, setter, value)
+        except RuntimeError:
+            pass  # 事件循环已关闭（程序正在退出）
 
+    threading.Thread(target=_worker, name="stdin-reader", daemon=True).start()
+    return await future
 
-def handle_special_command(user_input: str, agent, memory, logger, rag_system):
+
+async def handle_special_command(user_input: str, agent, memory, logger, rag_system):
     """处理特殊命令"""
     command = user_input.strip()[1:]  # 去掉!
     parts = command.split(None, 1)
@@ -74,13 +274,13 @@ def handle_special_command(user_input: str, agent, memory, logger, rag_system):
 === 特殊命令帮助 ===
 !help - 显示此帮助
 !tools - 列出所有可用工具
-!math <表达式> - 数学计算（如 !math 10+5*2）
+!math <表达式> - 数学计算（如 !math 10+5*2，支持 abs/round/min/max/pow 及 sqrt/log/sin 等）
 !date - 显示当前日期时间
 !system - 显示系统信息
 !validate <内容> - 验证内容（如邮箱、手机号）
 !text <文本> - 文本处理（去除空白、转换大小写等）
 !load <路径> - 加载文档到RAG系统
-!ask <问题> - 向RAG系统提问
+!ask <问题> - 向RAG系统提问（!ask --nocache <问题> 跳过缓存）
 !chain - 演示链功能
 !tools - 显示可用工具列表
 
@@ -91,39 +291,21 @@ def handle_special_command(user_input: str, agent, memory, logger, rag_system):
 !ask 文档中说了什么？
             """)
         elif cmd == "tools":
-            tool_manager = get_tool_manager()
-            tools = list(tool_manager.get_tool_names())
             print("\n可用工具:")
-            for name in tools:
-                tool = tool_manager.get_tool(name)
-                desc = tool.description.split('\n')[0] if tool.description else ""
+            for name, desc in get_tool_manager().get_tool_summaries():
                 print(f"- {name}: {desc}")
         elif cmd == "math":
             if not args:
                 print("请提供数学表达式，如: !math 10+5*2")
             else:
                 # 简单数学计算演示
-                import ast
                 try:
                     # 安全的数学表达式求值
-                    # 使用更兼容的节点类型列表
-                    allowed_nodes = (
-                        ast.Expression, ast.BinOp, ast.UnaryOp,
-                        ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow,
-                        ast.Name, ast.Call, ast.Constant
-                    )
-                    # 处理不同Python版本的兼容性
-                    if hasattr(ast, 'Num'):
-                        allowed_nodes += (ast.Num,)
-                    if hasattr(ast, 'NameConstant'):
-                        allowed_nodes += (ast.NameConstant,)
-
-                    tree = ast.parse(args, mode='eval')
-                    for node in ast.walk(tree):
-                        if not isinstance(node, allowed_nodes):
-                            print("❌ 不安全的数学表达式")
-                            return
-                    result = eval(args)
+                    code = compile_math_expression(args)
+                    if code is None:
+                        print("❌ 不安全的数学表达式")
+                        return
+                    result = eval(code, _MATH_GLOBALS)
                     print(f"结果: {result}")
                     logger.info(f"Math calculation: {args} = {result}")
                 except Exception as e:
@@ -134,7 +316,7 @@ def handle_special_command(user_input: str, agent, memory, logger, rag_system):
             print(f"当前日期: {DateUtils.format_date(DateUtils.today())}")
             print(f"星期: {DateUtils.get_day_of_week(DateUtils.today())}")
         elif cmd == "system":
-            summary = SystemUtils.get_system_summary()
+            summary = await asyncio.to_thread(SystemUtils.get_system_summary)
             print(f"\n系统信息:")
             print(f"平台: {summary['platform']['system']} {summary['platform']['architecture']}")
             print(f"CPU核心数: {summary['cpu']['count']}")
@@ -169,9 +351,10 @@ def handle_special_command(user_input: str, agent, memory, logger, rag_system):
             else:
                 if rag_system:
                     try:
-                        documents = load_documents(args)
+                        # 读取和解析文件会阻塞，放到线程中执行，不占用事件循环
+                        documents = await asyncio.to_thread(load_documents, args)
                         if documents:
-                            rag_system.add_documents(documents)
+                            await asyncio.to_thread(rag_system.add_documents, documents)
                             print(f"✅ 已加载 {len(documents)} 个文档到RAG系统")
                         else:
                             print("❌ 未找到文档")
@@ -180,11 +363,16 @@ def handle_special_command(user_input: str, agent, memory, logger, rag_system):
                 else:
                     print("❌ RAG系统未初始化")
         elif cmd == "ask":
+            use_cache = True
+            if args.startswith("--nocache"):
+                use_cache = False
+                args = args[len("--nocache"):].strip()
+
             if not args:
                 print("请提供问题，如: !ask 文档中说了什么？")
             else:
                 if rag_system:
-                    result = rag_system.query(args)
+                    result = await rag_system.aquery(args, use_cache=use_cache)
                     print(f"\n问题: {result['question']}")
                     print(f"答案: {result['answer']}")
                     print(f"置信度: {result['confidence']:.2f}")
@@ -220,7 +408,11 @@ def handle_special_command(user_input: str, agent, memory, logger, rag_system):
         print(f"❌ 命令执行失败: {str(e)}")
 
 
-if __name__ == "__main__":
+async def main():
+    """Agent 主循环（基于 asyncio）
+
+    LLM 调用使用 agent.ainvoke，等待模型期间不会阻塞事件循环。
+    """
     # 加载配置
     config = Config.get_instance()
     logger = Logger.get_logger()
@@ -233,7 +425,12 @@ if __name__ == "__main__":
     llm = ChatOllama(
         model=model_config.get("name", "qwen2.5-coder:7b"),
         temperature=model_config.get("temperature", 0.2),
-        num_ctx=model_config.get("num_ctx", 8192)
+        num_ctx=model_config.get("num_ctx", 8192),
+        # 保持模型常驻，工具调用前后两次请求可复用已缓存的提示前缀
+        keep_alive=model_config.get("keep_alive", "10m"),
+        # httpx 的读超时按相邻两次收到数据的间隔计算，流式输出时相当于逐 token 超时，
+        # Ollama 卡住时尽早失败，而不是一直占着连接
+        client_kwargs={"timeout": model_config.get("request_timeout", 120)}
     )
 
     logger.info(f"Model loaded: {model_config.get('name')}")
@@ -241,19 +438,12 @@ if __name__ == "__main__":
     # 获取工具管理器
     tool_manager = get_tool_manager()
 
-    # 获取所有工具
-    tools = list(tool_manager.get_tool_names())
-    tool_list = [tool_manager.get_tool(name) for name in tools]
+    # 获取所有工具及描述首行（由工具管理器缓存）
+    tool_list = tool_manager.get_tool_list()
+    tool_summaries = tool_manager.get_tool_summaries()
 
     # 动态生成系统提示
-    tool_descriptions = []
-    for name in tools:
-        tool = tool_manager.get_tool(name)
-        # 提取工具描述的第一行
-        desc = tool.description.split('\n')[0] if tool.description else ""
-        tool_descriptions.append(f"- {name} - {desc}")
-
-    tools_text = '\n'.join(tool_descriptions)
+    tools_text = '\n'.join(f"- {name} - {desc}" for name, desc in tool_summaries)
 
     # 创建 Agent
     system_prompt = f"""你是一个安全的 AI 助手。
@@ -282,8 +472,23 @@ if __name__ == "__main__":
 
     # 初始化 RAG 系统（用于文档问答）
     try:
-        vector_store = InMemoryVectorStore()
-        rag_system = RAGSystem(vector_store, llm=llm)
+        embedding = SimpleEmbedding()
+        vector_store = InMemoryVectorStore(embedding_function=embedding)
+        rag_config = config.get_rag_config()
+        rag_cache = None
+        if rag_config.get("cache_enabled", True):
+            # 只有语义嵌入才使用近似缓存，否则按问题文本精确缓存
+            rag_cache = create_query_cache(
+                embedding,
+                capacity=rag_config.get("cache_size", 1024),
+                tolerance=rag_config.get("cache_tolerance", 0.05)
+            )
+        rag_system = RAGSystem(vector_store, embedding_function=embedding, llm=llm, cache=rag_cache)
+        if rag_config.get("document_cache", True):
+            # !load 重复加载未修改的文件时直接读取磁盘缓存
+            data_loader_manager.set_cache(
+                DocumentCache(max_entries=rag_config.get("document_cache_size", 1024))
+            )
         logger.info("RAG system initialized with LLM")
     except Exception as e:
         logger.warning(f"RAG system initialization failed: {str(e)}")
@@ -298,9 +503,7 @@ if __name__ == "__main__":
     # 动态显示可用工具
     print("=== Secure AI Agent (type 'exit' to quit) ===")
     print("\n可用工具:")
-    for name in tools:
-        tool = tool_manager.get_tool(name)
-        desc = tool.description.split('\n')[0] if tool.description else ""
+    for name, desc in tool_summaries:
         print(f"- {name}: {desc}")
     print("\n安全特性:")
     print("- 路径限制在项目目录内")
@@ -310,7 +513,11 @@ if __name__ == "__main__":
     print()
 
     while True:
-        user_input = input(">> ")
+        try:
+            user_input = await read_user_input(">> ")
+        except EOFError:  # Ctrl+D / 输入流结束
+            logger.info("Agent shutting down...")
+            break
         if user_input.strip().lower() == "exit":
             logger.info("Agent shutting down...")
             break
@@ -318,11 +525,11 @@ if __name__ == "__main__":
         # 检查特殊命令
         if user_input.strip().startswith("!"):
             # 处理特殊命令
-            handle_special_command(user_input, agent, memory, logger, rag_system)
+            await handle_special_command(user_input, agent, memory, logger, rag_system)
             continue
 
         # 验证用户输入
-        is_safe, error = SecurityValidator.validate_user_input(user_input)
+        is_safe, error = validate_user_input_cached(user_input)
         if not is_safe:
             print(f"❌ 输入不安全: {error}")
             logger.warning(f"Unsafe input rejected: {user_input}")
@@ -335,7 +542,7 @@ if __name__ == "__main__":
         try:
             # 调用 agent 获取响应
             inputs = {"messages": memory.get_messages()}
-            result = agent.invoke(inputs)
+            result = await agent.ainvoke(inputs)
 
             # 获取消息
             if isinstance(result, dict) and 'messages' in result:
@@ -343,11 +550,14 @@ if __name__ == "__main__":
             else:
                 messages = result.messages if hasattr(result, 'messages') else []
 
+            # 只在本轮新产生的消息中查找，避免随对话增长反复扫描历史
+            messages = get_new_messages(messages, len(inputs["messages"]))
+
             # 找到最后一条 AI 消息
             ai_message = None
             for msg in reversed(messages):
                 content = msg.content if hasattr(msg, 'content') else msg.get('content', '')
-                if content and ('```json' in content or content.strip().startswith('{')):
+                if content and looks_like_tool_call(content):
                     ai_message = msg
                     break
 
@@ -366,7 +576,10 @@ if __name__ == "__main__":
                     tool_call_id = generate_tool_call_id()
 
                     # 使用工具管理器执行工具
-                    success, message, result = tool_manager.execute_tool(tool_name, arguments)
+                    # 工具涉及文件读写和 shell 命令，在线程中执行
+                    success, message, result = await asyncio.to_thread(
+                        tool_manager.execute_tool, tool_name, arguments
+                    )
 
                     if success:
                         print(f"✅ {result}")
@@ -386,22 +599,13 @@ if __name__ == "__main__":
                             tool_call_id=tool_call_id
                         )
 
-                    # 再次调用 LLM 获取最终响应
-                    final_result = agent.invoke({"messages": memory.get_messages()})
-
-                    if isinstance(final_result, dict) and 'messages' in final_result:
-                        final_messages = final_result['messages']
-                    else:
-                        final_messages = final_result.messages if hasattr(final_result, 'messages') else []
-
-                    # 显示最终响应
-                    for msg in reversed(final_messages):
-                        content = msg.content if hasattr(msg, 'content') else msg.get('content', '')
-                        if content and ('```json' not in content and not content.strip().startswith('{')):
-                            print("\n" + content)
-                            memory.add_message("assistant", content)
-                            logger.info(f"Final response: {content}")
-                            break
+                    # 再次调用 LLM，流式显示最终响应
+                    content = await stream_final_response(
+                        agent, {"messages": memory.get_messages()}
+                    )
+                    if content:
+                        memory.add_message("assistant", content)
+                        logger.info(f"Final response: {content}")
                 else:
                     # 验证失败
                     error_msg = f"❌ 工具调用不安全: {error}"
@@ -424,3 +628,16 @@ if __name__ == "__main__":
             logger.error(error_msg)
             import traceback
             traceback.print_exc()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n已退出")
+        # 读取输入的守护线程可能仍阻塞在 stdin 上并持有其缓冲锁，
+        # 正常的解释器收尾会因此中止，这里刷新输出后直接退出
+        logging.shutdown()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(130)
@@ -18,7 +18,7 @@ import os
 import sys
 import importlib
 import inspect
-from typing import Dict, Any, Callable, Optional
+from typing import Dict, Any, Callable, Optional, List, Tuple
 from langchain_core.tools import BaseTool
 
 # 添加当前目录到路径
@@ -46,6 +46,7 @@ class ToolManager:
 
         self.logger = Logger.get_logger()
         self.tools: Dict[str, BaseTool] = {}
+        self._summaries: Optional[List[Tuple[str, str]]] = None
         self._discover_tools()
 
         self.logger.info(f"ToolManager initialized with {len(self.tools)} tools")
@@ -138,10 +139,32 @@ class ToolManager:
         """
         return list(self.tools.keys())
 
+    def get_tool_list(self) -> List[BaseTool]:
+        """获取所有工具对象列表
+
+        Returns:
+            工具对象列表
+        """
+        return list(self.tools.values())
+
+    def get_tool_summaries(self) -> List[Tuple[str, str]]:
+        """获取工具名称及描述首行（结果缓存，重新加载工具时失效）
+
+        Returns:
+            (工具名称, 描述首行) 列表
+        """
+        if self._summaries is None:
+            self._summaries = [
+                (name, tool.description.split('\n')[0] if tool.description else "")
+                for name, tool in self.tools.items()
+            ]
+        return self._summaries
+
     def reload_tools(self):
         """重新加载工具（用于动态添加工具）"""
         self.logger.info("Reloading tools...")
         self.tools.clear()
+        self._summaries = None
         self._discover_tools()
         self.logger.info(f"Tools reloaded: {len(self.tools)} tools available")
 
@@ -0,0 +1,44 @@
+"""JSON 解析工具
+
+orjson 可用时用其加速解析；在 orjson 与标准库 json 行为不一致的输入上回退到标准库，
+保证解析结果与 json.loads 相同。
+"""
+
+import json
+import re
+from typing import Any, Union
+
+# orjson 可选，用于加速 JSON 解析
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 19 位及以上的连续数字可能超出 64 位整数范围，orjson 会将其静默解析为浮点数
+LONG_DIGITS_REGEX = re.compile(rb'\d{19,}')
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """解析 JSON，结果与 json.loads 一致
+
+    以下情况交给标准库解析：
+    - orjson 拒绝而标准库接受的输入（NaN/Infinity、UTF-8 BOM 等）
+    - 含可能超出 64 位整数范围的长数字
+
+    Args:
+        data: JSON 文本（bytes 按 UTF-8/16/32 自动识别）
+
+    Returns:
+        解析结果
+
+    Raises:
+        json.JSONDecodeError: 不是合法的 JSON
+    """
+    if orjson is not None:
+        raw = data.encode('utf-8', 'surrogatepass') if isinstance(data, str) else data
+        if not LONG_DIGITS_REGEX.search(raw):
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass
+    return json.loads(data)
@@ -3,14 +3,20 @@
 管理 Agent 的对话历史和上下文
 """
 
-from typing import List, Dict, Any, Optional
+from collections import deque
+from typing import Deque, List, Dict, Any, Optional
 import json
 import os
 
+from ..json_utils import json_loads
+
 
 class Message:
     """消息类"""
 
+    # 对话历史中会保存大量消息，使用 __slots__ 省去每个实例的 __dict__
+    __slots__ = ("role", "content", "name", "tool_call_id")
+
     def __init__(self, role: str, content: str, name: Optional[str] = None, tool_call_id: Optional[str] = None):
         self.role = role
         self.content = content
@@ -45,16 +51,12 @@ class ConversationMemory:
 
     def __init__(self, max_messages: int = 100):
         self.max_messages = max_messages
-        self.messages: List[Message] = []
+        # 定长队列：超过最大消息数时自动丢弃最旧的消息（O(1)）
+        self.messages: Deque[Message] = deque(maxlen=max_messages)
 
     def add_message(self, role: str, content: str, name: Optional[str] = None, tool_call_id: Optional[str] = None):
         """添加消息"""
-        message = Message(role, content, name, tool_call_id)
-        self.messages.append(message)
-
-        # 如果超过最大消息数，删除最旧的消息
-        if len(self.messages) > self.max_messages:
-            self.messages.pop(0)
+        self.messages.append(Message(role, content, name, tool_call_id))
 
     def get_messages(self) -> List[Dict[str, Any]]:
         """获取所有消息（字典格式）"""
@@ -67,16 +69,26 @@ class ConversationMemory:
     def save_to_file(self, filepath: str):
         """保存到文件"""
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, "w") as f:
-            json.dump(
-                [msg.to_dict() for msg in self.messages],
-                f,
-                indent=2
-            )
+        data = [msg.to_dict() for msg in self.messages]
+        # 先写临时文件再原子替换，写入中途崩溃不会损坏已有的历史文件
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        try:
+            # 保持标准库的 ASCII 转义输出：文件格式不变，终端输入中的代理字符也能保存
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
     def load_from_file(self, filepath: str):
         """从文件加载"""
         if os.path.exists(filepath):
-            with open(filepath, "r") as f:
-                data = json.load(f)
-                self.messages = [Message.from_dict(msg) for msg in data]
+            # 按字节读取，编码由 JSON 解析自动识别，不依赖系统默认编码
+            with open(filepath, "rb") as f:
+                data = json_loads(f.read())
+            self.messages = deque(
+                (Message.from_dict(msg) for msg in data),
+                maxlen=self.max_messages
+            )
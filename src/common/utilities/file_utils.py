@@ -10,17 +10,65 @@ import csv
 import gzip
 import shutil
 import hashlib
+import math
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Union, BinaryIO, TextIO
 import logging
 
+from ..json_utils import json_loads
+
+# orjson 可选，用于加速 JSON 序列化
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+# 经 orjson 序列化后与标准库 json 输出一致的类型（按精确类型判断，不含子类）
+_ORJSON_SAFE_TYPES = frozenset((str, int, bool, type(None), float, dict, list, tuple))
+
+
+def _orjson_matches_stdlib(data: Any) -> bool:
+    """检查数据经 orjson 序列化后是否与标准库 json 完全一致
+
+    orjson 对需要指数表示的浮点数写法不同（1e-05 写为 0.00001，1e+16 写为 1e16），
+    会把 NaN/Infinity 静默写成 null 造成数据丢失，
+    还会直接序列化 UUID、Enum 等标准库拒绝的类型；其余基本类型输出一致。
+
+    Args:
+        data: 待序列化的数据
+
+    Returns:
+        只含基本 JSON 类型且不含上述浮点数（包括字典键）时返回 True
+    """
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        obj_type = type(obj)
+        if obj_type not in _ORJSON_SAFE_TYPES:
+            return False
+        if obj_type is float:
+            if not math.isfinite(obj) or (obj != 0 and not 1e-4 <= abs(obj) < 1e16):
+                return False
+        elif obj_type is dict:
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif obj_type is list or obj_type is tuple:
+            stack.extend(obj)
+    return True
+
+
 class FileUtils:
     """文件处理工具类"""
 
+    # 流式复制（压缩/解压）时每次读写的块大小
+    COPY_BUFFER_SIZE = 1024 * 1024
+
     # 常见文件扩展名映射
     FILE_EXTENSIONS = {
         '.txt': '文本文件',
@@ -68,6 +116,32 @@ class FileUtils:
             logger.error(f"读取文件失败 {file_path}: {str(e)}")
             raise
 
+    @staticmethod
+    def read_lines(
+        file_path: str,
+        start: int = 0,
+        count: Optional[int] = None,
+        encoding: str = 'utf-8'
+    ) -> List[str]:
+        """按行读取文本文件的一段（逐行迭代，读够即停止）
+
+        Args:
+            file_path: 文件路径
+            start: 起始行号（从 0 开始）
+            count: 读取行数，None 表示读到文件末尾
+            encoding: 编码格式
+
+        Returns:
+            行列表（保留行尾换行符）
+        """
+        try:
+            stop = None if count is None else start + count
+            with open(file_path, 'r', encoding=encoding) as f:
+                return list(islice(f, start, stop))
+        except Exception as e:
+            logger.error(f"读取文件行失败 {file_path}: {str(e)}")
+            raise
+
     @staticmethod
     def write_file(
         file_path: str,
@@ -105,6 +179,12 @@ class FileUtils:
             JSON数据
         """
         try:
+            # orjson 只接受 UTF-8，其他编码走标准库；
+            # json_loads 在 orjson 与标准库行为不一致的输入上自动回退
+            if encoding.lower().replace('-', '') == 'utf8':
+                with open(file_path, 'rb') as f:
+                    return json_loads(f.read())
+
             with open(file_path, 'r', encoding=encoding) as f:
                 return json.load(f)
         except Exception as e:
@@ -121,6 +201,10 @@ class FileUtils:
     ) -> None:
         """写入JSON文件
 
+        默认参数下优先使用 orjson 序列化，输出与 json.dump 相同；
+        数据含 orjson 写法不同的浮点数（指数形式、NaN/Infinity）或非基本 JSON 类型
+        （日期、dataclass、UUID、子类等）时使用标准库，不支持的类型照常抛出 TypeError。
+
         Args:
             file_path: 文件路径
             data: 要写入的数据
@@ -131,6 +215,25 @@ class FileUtils:
         try:
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
+            # orjson 直接输出 UTF-8 字节，其 2 空格缩进格式与标准库一致；
+            # 含指数形式或非有限浮点数、非基本类型时交给标准库，保证输出不变且不丢失 NaN/Infinity；
+            # PASSTHROUGH 选项让 orjson 不再自行序列化日期、dataclass 和子类
+            if (orjson is not None and indent == 2 and not ensure_ascii
+                    and encoding.lower().replace('-', '') == 'utf8'
+                    and _orjson_matches_stdlib(data)):
+                try:
+                    content = orjson.dumps(data, option=(
+                        orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                        | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+                        | orjson.OPT_PASSTHROUGH_SUBCLASS
+                    ))
+                except TypeError:
+                    content = None  # orjson 不支持的类型，交给标准库处理
+                if content is not None:
+                    with open(file_path, 'wb') as f:
+                        f.write(content)
+                    return
+
             with open(file_path, 'w', encoding=encoding) as f:
                 json.dump(data, f, indent=indent, ensure_ascii=ensure_ascii)
         except Exception as e:
@@ -196,11 +299,45 @@ class FileUtils:
             if create_dirs:
                 os.makedirs(os.path.dirname(dst), exist_ok=True)
 
-            shutil.copy2(src, dst)
+            if os.path.isdir(dst):
+                dst = os.path.join(dst, os.path.basename(src))
+
+            if os.path.isfile(src) and FileUtils._copy_file_range(src, dst):
+                shutil.copystat(src, dst)
+            else:
+                shutil.copy2(src, dst)
         except Exception as e:
             logger.error(f"复制文件失败 {src} -> {dst}: {str(e)}")
             raise
 
+    @staticmethod
+    def _copy_file_range(src: str, dst: str) -> bool:
+        """使用 os.copy_file_range 在内核中复制文件内容（Linux）
+
+        支持 reflink 的文件系统（XFS/Btrfs）上可直接共享数据块。
+
+        Args:
+            src: 源文件路径
+            dst: 目标文件路径
+
+        Returns:
+            是否复制成功；平台或文件系统不支持时返回 False，由调用方回退
+        """
+        if not hasattr(os, 'copy_file_range'):
+            return False
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            raise shutil.SameFileError(f"{src} 与 {dst} 是同一个文件")
+
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+            try:
+                while os.copy_file_range(src_fd, dst_fd, 2 ** 30):
+                    pass
+            except OSError:
+                # 跨设备（旧内核）或文件系统不支持，交给 shutil 处理
+                return False
+        return True
+
     @staticmethod
     def move_file(src: str, dst: str, create_dirs: bool = True) -> None:
         """移动文件
@@ -260,6 +397,68 @@ class FileUtils:
             logger.error(f"删除目录失败 {dir_path}: {str(e)}")
             raise
 
+    @staticmethod
+    def copy_directory(src: str, dst: str, max_workers: Optional[int] = None) -> int:
+        """复制目录（多线程并行复制文件）
+
+        先按顺序创建全部目录，再把文件复制任务分发到线程池，
+        小文件较多时可以重叠各文件的系统调用等待。
+        与 shutil.copytree 默认行为一致，符号链接（文件和目录）按其指向的内容复制；
+        指向当前遍历路径上任一目录（按设备号和 inode 判断）的链接会形成环，跳过。
+
+        Args:
+            src: 源目录路径
+            dst: 目标目录路径
+            max_workers: 最大线程数，默认 CPU 核数的 4 倍（不超过 32）
+
+        Returns:
+            复制的文件数量
+        """
+        try:
+            if not os.path.isdir(src):
+                raise FileNotFoundError(f"源目录不存在: {src}")
+
+            dir_pairs = []
+            jobs = []
+            # 每个已遍历目录到其路径链上全部目录 (st_dev, st_ino) 的映射
+            ancestors = {}
+            for root, dirs, filenames in os.walk(src, followlinks=True):
+                root_stat = os.stat(root)
+                chain = ancestors.pop(root, frozenset()) | {(root_stat.st_dev, root_stat.st_ino)}
+                for name in list(dirs):
+                    dir_path = os.path.join(root, name)
+                    dir_stat = os.stat(dir_path)
+                    if (dir_stat.st_dev, dir_stat.st_ino) in chain:
+                        logger.warning(f"跳过形成环的目录链接: {dir_path}")
+                        dirs.remove(name)
+                    else:
+                        ancestors[dir_path] = chain
+                target_dir = os.path.join(dst, os.path.relpath(root, src))
+                os.makedirs(target_dir, exist_ok=True)
+                dir_pairs.append((root, target_dir))
+                for filename in filenames:
+                    jobs.append((os.path.join(root, filename), os.path.join(target_dir, filename)))
+
+            if max_workers is None:
+                max_workers = min(32, (os.cpu_count() or 1) * 4)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(FileUtils.copy_file, src_file, dst_file, False)
+                    for src_file, dst_file in jobs
+                ]
+                for future in futures:
+                    future.result()
+
+            # 文件写入会改变目录时间戳，目录元数据最后再复制
+            for src_dir, dst_dir in dir_pairs:
+                shutil.copystat(src_dir, dst_dir)
+
+            return len(jobs)
+        except Exception as e:
+            logger.error(f"复制目录失败 {src} -> {dst}: {str(e)}")
+            raise
+
     @staticmethod
     def list_files(
         dir_path: str,
@@ -294,13 +493,14 @@ class FileUtils:
                         if pattern is None or fnmatch.fnmatch(filename, pattern):
                             files.append(file_path)
             else:
-                for item in os.listdir(dir_path):
-                    item_path = os.path.join(dir_path, item)
-                    if os.path.isfile(item_path):
-                        if pattern is None or fnmatch.fnmatch(item, pattern):
-                            files.append(item_path)
-                    elif include_dirs:
-                        files.append(item_path)
+                # scandir 的 DirEntry 自带类型信息，无需逐项 stat
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            if pattern is None or fnmatch.fnmatch(entry.name, pattern):
+                                files.append(entry.path)
+                        elif include_dirs:
+                            files.append(entry.path)
 
             return files
         except Exception as e:
@@ -361,6 +561,30 @@ class FileUtils:
         mime_type, _ = mimetypes.guess_type(file_path)
         return mime_type or 'application/octet-stream'
 
+    @staticmethod
+    def _hash_file(file_path: str, hasher: Any, chunk_size: int) -> str:
+        """按块计算文件哈希
+
+        复用同一个缓冲区（readinto），不为每个块分配新的 bytes 对象。
+
+        Args:
+            file_path: 文件路径
+            hasher: hashlib 哈希对象
+            chunk_size: 读取块大小
+
+        Returns:
+            十六进制哈希值
+        """
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        with open(file_path, 'rb', buffering=0) as f:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                hasher.update(view[:n])
+        return hasher.hexdigest()
+
     @staticmethod
     def calculate_md5(file_path: str, chunk_size: int = 8192) -> str:
         """计算文件MD5值
@@ -373,11 +597,7 @@ class FileUtils:
             MD5哈希值
         """
         try:
-            md5_hash = hashlib.md5()
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(chunk_size), b''):
-                    md5_hash.update(chunk)
-            return md5_hash.hexdigest()
+            return FileUtils._hash_file(file_path, hashlib.md5(), chunk_size)
         except Exception as e:
             logger.error(f"计算MD5失败 {file_path}: {str(e)}")
             raise
@@ -394,15 +614,39 @@ class FileUtils:
             SHA256哈希值
         """
         try:
-            sha256_hash = hashlib.sha256()
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(chunk_size), b''):
-                    sha256_hash.update(chunk)
-            return sha256_hash.hexdigest()
+            return FileUtils._hash_file(file_path, hashlib.sha256(), chunk_size)
         except Exception as e:
             logger.error(f"计算SHA256失败 {file_path}: {str(e)}")
             raise
 
+    @staticmethod
+    def count_lines(file_path: str, chunk_size: int = 1024 * 1024) -> int:
+        """统计文件行数（按块读取字节，不解码、不加载整个文件）
+
+        Args:
+            file_path: 文件路径
+            chunk_size: 读取块大小
+
+        Returns:
+            行数（末尾没有换行符的最后一行也计入）
+        """
+        try:
+            count = 0
+            last_byte = ord('\n')
+            # 无缓冲读入同一块预分配缓冲区，不为每块新建 bytes 对象
+            buf = bytearray(chunk_size)
+            with open(file_path, 'rb', buffering=0) as f:
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    count += buf.count(b'\n', 0, n)
+                    last_byte = buf[n - 1]
+            return count if last_byte == ord('\n') else count + 1
+        except Exception as e:
+            logger.error(f"统计行数失败 {file_path}: {str(e)}")
+            raise
+
     @staticmethod
     def compress_file(src: str, dst: str) -> None:
         """压缩文件（gzip）
@@ -414,7 +658,7 @@ class FileUtils:
         try:
             with open(src, 'rb') as f_in:
                 with gzip.open(dst, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+                    shutil.copyfileobj(f_in, f_out, FileUtils.COPY_BUFFER_SIZE)
         except Exception as e:
             logger.error(f"压缩文件失败 {src} -> {dst}: {str(e)}")
             raise
@@ -430,7 +674,7 @@ class FileUtils:
         try:
             with gzip.open(src, 'rb') as f_in:
                 with open(dst, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+                    shutil.copyfileobj(f_in, f_out, FileUtils.COPY_BUFFER_SIZE)
         except Exception as e:
             logger.error(f"解压缩文件失败 {src} -> {dst}: {str(e)}")
             raise
@@ -511,7 +755,7 @@ class FileUtils:
     def find_files(
         search_path: str,
         name_pattern: Optional[str] = None,
-        extension: Optional[str] = None,
+        extension: Optional[Union[str, List[str]]] = None,
         max_results: int = 100
     ) -> List[str]:
         """查找文件
@@ -519,25 +763,32 @@ class FileUtils:
         Args:
             search_path: 搜索路径
             name_pattern: 文件名模式
-            extension: 文件扩展名
+            extension: 文件扩展名（可传入多个）
             max_results: 最大结果数
 
         Returns:
             匹配的文件路径列表
         """
         try:
+            import fnmatch
+
+            # 扩展名在循环外统一转为小写元组，endswith 一次匹配全部
+            extensions = None
+            if extension:
+                if isinstance(extension, str):
+                    extension = [extension]
+                extensions = tuple(ext.lower() for ext in extension)
+
             files = []
             for root, _, filenames in os.walk(search_path):
                 for filename in filenames:
                     # 检查扩展名
-                    if extension and not filename.lower().endswith(extension.lower()):
+                    if extensions and not filename.lower().endswith(extensions):
                         continue
 
                     # 检查名称模式
-                    if name_pattern:
-                        import fnmatch
-                        if not fnmatch.fnmatch(filename, name_pattern):
-                            continue
+                    if name_pattern and not fnmatch.fnmatch(filename, name_pattern):
+                        continue
 
                     files.append(os.path.join(root, filename))
 
@@ -561,10 +812,14 @@ class FileUtils:
             是否为二进制文件
         """
         try:
-            with open(file_path, 'rb') as f:
-                chunk = f.read(chunk_size)
-                # 检查是否包含空字节
-                return b'\0' in chunk
+            # 只看文件头，直接 os.read 一次，省去缓冲读取器及其缓冲区
+            fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                chunk = os.read(fd, chunk_size)
+            finally:
+                os.close(fd)
+            # 检查是否包含空字节
+            return b'\0' in chunk
         except Exception as e:
             logger.error(f"判断文件类型失败 {file_path}: {str(e)}")
             raise
@@ -581,11 +836,18 @@ class FileUtils:
         """
         try:
             total_size = 0
-            for dirpath, dirnames, filenames in os.walk(dir_path):
-                for filename in filenames:
-                    file_path = os.path.join(dirpath, filename)
-                    if os.path.exists(file_path):
-                        total_size += os.path.getsize(file_path)
+            pending = [dir_path]
+            while pending:
+                try:
+                    entries = os.scandir(pending.pop())
+                except OSError:
+                    continue
+                with entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            total_size += entry.stat().st_size
             return total_size
         except Exception as e:
             logger.error(f"获取目录大小失败 {dir_path}: {str(e)}")
@@ -9,6 +9,15 @@ import statistics
 from typing import List, Union, Tuple, Dict, Any
 from functools import lru_cache
 
+# numpy 可选，用于大数组的向量化统计
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 超过该长度时才转换为 numpy 数组（小列表转换开销大于收益）
+NUMPY_MIN_SIZE = 1000
+
 
 class MathUtils:
     """数学计算工具类"""
@@ -112,6 +121,47 @@ class MathUtils:
             raise ValueError("数字列表不能为空")
         return statistics.mean(numbers)
 
+    @staticmethod
+    def describe(numbers: List[Union[int, float]]) -> Dict[str, float]:
+        """计算基础统计量（数量、总和、最小值、最大值、平均值）
+
+        大数组使用 numpy 按 float64 求和（避免 int64 溢出回绕），否则单次遍历完成所有统计。
+        两种路径都返回 Python 原生数值（可直接 json 序列化）：sum/mean 为 float，
+        min/max 为输入中的原始元素（保持其类型，不做类型提升）。
+
+        Args:
+            numbers: 数字列表
+
+        Returns:
+            统计结果字典
+        """
+        if not numbers:
+            raise ValueError("数字列表不能为空")
+
+        count = len(numbers)
+        if np is not None and count >= NUMPY_MIN_SIZE:
+            total = float(np.asarray(numbers, dtype=np.float64).sum())
+            # 内置 min/max 在 C 中遍历且不转换类型，返回首个最小/最大的原始元素
+            minimum = min(numbers)
+            maximum = max(numbers)
+        else:
+            total = 0.0
+            minimum = maximum = numbers[0]
+            for value in numbers:
+                total += value
+                if value < minimum:
+                    minimum = value
+                elif value > maximum:
+                    maximum = value
+
+        return {
+            "count": count,
+            "sum": total,
+            "min": minimum,
+            "max": maximum,
+            "mean": total / count
+        }
+
     @staticmethod
     def median(numbers: List[Union[int, float]]) -> float:
         """计算中位数"""
@@ -10,7 +10,8 @@ import platform
 import socket
 import getpass
 import subprocess
-from typing import Dict, List, Any, Optional
+import time
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,11 @@ except ImportError:
 class SystemUtils:
     """系统信息工具类"""
 
+    # URL 可达性探测结果缓存: url -> (探测时刻, 结果)，按探测时刻先后排列
+    _url_reachable_cache: Dict[str, Tuple[float, bool]] = {}
+    # URL 可达性缓存的最大条目数
+    URL_REACHABLE_CACHE_SIZE = 256
+
     @staticmethod
     def get_platform_info() -> Dict[str, str]:
         """获取平台信息
@@ -415,13 +421,21 @@ class SystemUtils:
             目录大小（字节）
         """
         total_size = 0
-        for dirpath, dirnames, filenames in os.walk(dir_path):
-            for filename in filenames:
-                file_path = os.path.join(dirpath, filename)
-                try:
-                    total_size += os.path.getsize(file_path)
-                except (OSError, IOError):
-                    pass
+        pending = [dir_path]
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            total_size += entry.stat().st_size
+                    except OSError:
+                        pass
         return total_size
 
     @staticmethod
@@ -480,12 +494,16 @@ class SystemUtils:
                 return True
 
     @staticmethod
-    def check_url_reachable(url: str, timeout: float = 5.0) -> bool:
+    def check_url_reachable(url: str, timeout: float = 5.0, cache_ttl: float = 5.0) -> bool:
         """检查URL是否可访问
 
+        短时间内对同一 URL 的重复探测直接返回缓存结果，不再发起请求。
+        写入缓存时清理已过期的条目，并限制缓存条目数。
+
         Args:
             url: URL地址
             timeout: 超时时间（秒）
+            cache_ttl: 结果缓存时间（秒），0 表示不使用缓存
 
         Returns:
             是否可访问
@@ -493,11 +511,29 @@ class SystemUtils:
         import urllib.request
         import urllib.error
 
+        now = time.monotonic()
+        cached = SystemUtils._url_reachable_cache.get(url)
+        if cached is not None and now - cached[0] < cache_ttl:
+            return cached[1]
+
         try:
-            urllib.request.urlopen(url, timeout=timeout)
-            return True
+            # 及时关闭响应，释放连接而不是等待垃圾回收
+            with urllib.request.urlopen(url, timeout=timeout):
+                reachable = True
         except (urllib.error.URLError, socket.timeout):
-            return False
+            reachable = False
+
+        if cache_ttl > 0:
+            cache = SystemUtils._url_reachable_cache
+            now = time.monotonic()
+            cache.pop(url, None)  # 重新插入到末尾，保持按探测时刻排序
+            cache[url] = (now, reachable)
+            while cache:
+                oldest = next(iter(cache))
+                if now - cache[oldest][0] < cache_ttl and len(cache) <= SystemUtils.URL_REACHABLE_CACHE_SIZE:
+                    break
+                cache.pop(oldest, None)
+        return reachable
 
 
 # 便捷函数
@@ -6,7 +6,10 @@
 
 import re
 import html
+import heapq
 import unicodedata
+from collections import Counter
+from operator import itemgetter
 from typing import List, Dict, Any, Optional, Union
 import logging
 
@@ -16,6 +19,24 @@ logger = logging.getLogger(__name__)
 class TextUtils:
     """文本处理工具类"""
 
+    # 预编译的正则表达式
+    WHITESPACE_REGEX = re.compile(r'\s+')
+    DIGITS_REGEX = re.compile(r'\d+')
+    NON_ALNUM_SPACE_REGEX = re.compile(r'[^a-zA-Z0-9\s]')
+    NON_ALNUM_REGEX = re.compile(r'[^a-zA-Z0-9]')
+    WORD_REGEX = re.compile(r'\w+')  # 贪婪匹配的 \w+ 两端天然是词边界，无需 \b
+    EMAIL_REGEX = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+    URL_REGEX = re.compile(r'https?://[^\s]+')
+    PHONE_REGEX = re.compile(r'1[3-9]\d{9}')  # 中国手机号
+    HASHTAG_REGEX = re.compile(r'#\w+')
+    MENTION_REGEX = re.compile(r'@\w+')
+    SENTENCE_END_REGEX = re.compile(r'[.!?。！？]+')
+    SLUG_INVALID_REGEX = re.compile(r'[^a-zA-Z0-9\s-]')
+    CAMEL_WORD_REGEX = re.compile('(.)([A-Z][a-z]+)')
+    CAMEL_LOWER_UPPER_REGEX = re.compile('([a-z0-9])([A-Z])')
+    # 与 '<.*?>' 匹配结果相同，但不依赖惰性量词回溯
+    HTML_TAG_REGEX = re.compile(r'<[^>\n]*>')
+
     @staticmethod
     def to_lowercase(text: str) -> str:
         """转换为小写
@@ -86,7 +107,7 @@ class TextUtils:
         Returns:
             去除空白后的文本
         """
-        return re.sub(r'\s+', '', text) if text else ""
+        return TextUtils.WHITESPACE_REGEX.sub('', text) if text else ""
 
     @staticmethod
     def collapse_whitespace(text: str) -> str:
@@ -98,7 +119,7 @@ class TextUtils:
         Returns:
             折叠空白后的文本
         """
-        return re.sub(r'\s+', ' ', text) if text else ""
+        return TextUtils.WHITESPACE_REGEX.sub(' ', text) if text else ""
 
     @staticmethod
     def remove_punctuation(text: str) -> str:
@@ -123,7 +144,7 @@ class TextUtils:
         Returns:
             去除数字后的文本
         """
-        return re.sub(r'\d+', '', text) if text else ""
+        return TextUtils.DIGITS_REGEX.sub('', text) if text else ""
 
     @staticmethod
     def remove_special_chars(text: str, keep_spaces: bool = True) -> str:
@@ -137,9 +158,9 @@ class TextUtils:
             去除特殊字符后的文本
         """
         if keep_spaces:
-            return re.sub(r'[^a-zA-Z0-9\s]', '', text) if text else ""
+            return TextUtils.NON_ALNUM_SPACE_REGEX.sub('', text) if text else ""
         else:
-            return re.sub(r'[^a-zA-Z0-9]', '', text) if text else ""
+            return TextUtils.NON_ALNUM_REGEX.sub('', text) if text else ""
 
     @staticmethod
     def escape_html(text: str) -> str:
@@ -223,7 +244,7 @@ class TextUtils:
         """
         if not text:
             return 0
-        return len(re.findall(r'\b\w+\b', text))
+        return len(TextUtils.WORD_REGEX.findall(text))
 
     @staticmethod
     def char_count(text: str, include_spaces: bool = True) -> int:
@@ -281,8 +302,7 @@ class TextUtils:
         if not text:
             return []
 
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        return re.findall(email_pattern, text)
+        return TextUtils.EMAIL_REGEX.findall(text)
 
     @staticmethod
     def extract_urls(text: str) -> List[str]:
@@ -297,8 +317,7 @@ class TextUtils:
         if not text:
             return []
 
-        url_pattern = r'https?://[^\s]+'
-        return re.findall(url_pattern, text)
+        return TextUtils.URL_REGEX.findall(text)
 
     @staticmethod
     def extract_phone_numbers(text: str) -> List[str]:
@@ -313,8 +332,7 @@ class TextUtils:
         if not text:
             return []
 
-        phone_pattern = r'1[3-9]\d{9}'
-        return re.findall(phone_pattern, text)
+        return TextUtils.PHONE_REGEX.findall(text)
 
     @staticmethod
     def extract_hashtags(text: str) -> List[str]:
@@ -329,8 +347,7 @@ class TextUtils:
         if not text:
             return []
 
-        hashtag_pattern = r'#\w+'
-        return re.findall(hashtag_pattern, text)
+        return TextUtils.HASHTAG_REGEX.findall(text)
 
     @staticmethod
     def extract_mentions(text: str) -> List[str]:
@@ -345,8 +362,7 @@ class TextUtils:
         if not text:
             return []
 
-        mention_pattern = r'@\w+'
-        return re.findall(mention_pattern, text)
+        return TextUtils.MENTION_REGEX.findall(text)
 
     @staticmethod
     def replace_pattern(text: str, pattern: str, replacement: str) -> str:
@@ -378,8 +394,7 @@ class TextUtils:
             return []
 
         # 简单句子分割（按句号、问号、感叹号分割）
-        sentence_pattern = r'[.!?。！？]+'
-        sentences = re.split(sentence_pattern, text)
+        sentences = TextUtils.SENTENCE_END_REGEX.split(text)
         return [s.strip() for s in sentences if s.strip()]
 
     @staticmethod
@@ -416,10 +431,10 @@ class TextUtils:
         text = text.lower() if lowercase else text
 
         # 替换特殊字符为连字符
-        text = re.sub(r'[^a-zA-Z0-9\s-]', '', text)
+        text = TextUtils.SLUG_INVALID_REGEX.sub('', text)
 
         # 折叠空白
-        text = re.sub(r'\s+', '-', text)
+        text = TextUtils.WHITESPACE_REGEX.sub('-', text)
 
         # 去除首尾连字符
         return text.strip('-')
@@ -438,8 +453,8 @@ class TextUtils:
             return ""
 
         # 在大小写转换处插入下划线
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', text)
-        s2 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1)
+        s1 = TextUtils.CAMEL_WORD_REGEX.sub(r'\1_\2', text)
+        s2 = TextUtils.CAMEL_LOWER_UPPER_REGEX.sub(r'\1_\2', s1)
         return s2.lower()
 
     @staticmethod
@@ -587,7 +602,7 @@ class TextUtils:
 
     @staticmethod
     def remove_html_tags(text: str) -> str:
-        """去除HTML标签
+        """去除HTML标签，并解码HTML实体（如 &amp; &nbsp; &#x27;）
 
         Args:
             text: 包含HTML的文本
@@ -598,9 +613,12 @@ class TextUtils:
         if not text:
             return ""
 
-        # 简单HTML标签去除
-        clean = re.compile('<.*?>')
-        return re.sub(clean, '', text)
+        # 不含标签时无需正则替换
+        if '<' not in text:
+            return html.unescape(text)
+
+        # 先去标签再一次性解码实体，避免 &lt; 解码出的 '<' 被当作标签删除
+        return html.unescape(TextUtils.HTML_TAG_REGEX.sub('', text))
 
     @staticmethod
     def extract_text_between(text: str, start_pattern: str, end_pattern: str) -> List[str]:
@@ -634,15 +652,8 @@ class TextUtils:
         if not text:
             return {}
 
-        # 提取单词
-        words = re.findall(r'\b\w+\b', text.lower())
-
-        # 统计词频
-        word_count = {}
-        for word in words:
-            word_count[word] = word_count.get(word, 0) + 1
-
-        return word_count
+        # 提取单词并统计词频（Counter 的计数循环由 C 实现）
+        return Counter(TextUtils.WORD_REGEX.findall(text.lower()))
 
     @staticmethod
     def get_text_statistics(text: str) -> Dict[str, Any]:
@@ -667,7 +678,8 @@ class TextUtils:
             }
 
         char_count = len(text)
-        char_count_no_spaces = len(text.replace(' ', ''))
+        # 直接计数空格，不生成去空格后的副本
+        char_count_no_spaces = char_count - text.count(' ')
         word_count = TextUtils.word_count(text)
         line_count = TextUtils.line_count(text)
         paragraph_count = TextUtils.paragraph_count(text)
@@ -701,8 +713,7 @@ def clean_text(text: str) -> str:
 def extract_keywords(text: str, top_n: int = 10) -> List[tuple]:
     """便捷函数：提取关键词"""
     word_count = TextUtils.count_words(text)
-    sorted_words = sorted(word_count.items(), key=lambda x: x[1], reverse=True)
-    return sorted_words[:top_n]
+    return heapq.nlargest(top_n, word_count.items(), key=itemgetter(1))
 
 
 # 使用示例
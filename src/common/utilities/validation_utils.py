@@ -54,6 +54,25 @@ class ValidationUtils:
         r'^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$'
     )
 
+    # 危险SQL关键字（匹配大写后的文本）
+    SQL_KEYWORD_REGEX = re.compile(
+        '|'.join([
+            'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'DROP', 'CREATE',
+            'ALTER', 'EXEC', 'EXECUTE', 'UNION', 'SCRIPT', 'OR', 'AND'
+        ])
+    )
+
+    # 危险标签和脚本
+    XSS_REGEX = re.compile(
+        r'<script[^>]*>.*?</script>|'  # script标签
+        r'javascript:|'  # javascript协议
+        r'on\w+\s*=|'  # 事件处理器
+        r'<iframe[^>]*>.*?</iframe>|'  # iframe标签
+        r'<object[^>]*>.*?</object>|'  # object标签
+        r'<embed[^>]*>.*?</embed>',  # embed标签
+        re.IGNORECASE | re.DOTALL
+    )
+
     @staticmethod
     def is_email(email: str) -> bool:
         """验证邮箱地址
@@ -539,14 +558,8 @@ class ValidationUtils:
         if not text:
             return True
 
-        # 检查危险SQL关键字
-        sql_keywords = [
-            'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'DROP', 'CREATE',
-            'ALTER', 'EXEC', 'EXECUTE', 'UNION', 'SCRIPT', 'OR', 'AND'
-        ]
-
-        text_upper = text.upper()
-        return not any(keyword in text_upper for keyword in sql_keywords)
+        # 检查危险SQL关键字（所有关键字合并为一个正则，单次扫描）
+        return not ValidationUtils.SQL_KEYWORD_REGEX.search(text.upper())
 
     @staticmethod
     def is_xss_safe(text: str) -> bool:
@@ -561,21 +574,8 @@ class ValidationUtils:
         if not text:
             return True
 
-        # 检查危险标签和脚本
-        xss_patterns = [
-            r'<script[^>]*>.*?</script>',  # script标签
-            r'javascript:',  # javascript协议
-            r'on\w+\s*=',  # 事件处理器
-            r'<iframe[^>]*>.*?</iframe>',  # iframe标签
-            r'<object[^>]*>.*?</object>',  # object标签
-            r'<embed[^>]*>.*?</embed>',  # embed标签
-        ]
-
-        for pattern in xss_patterns:
-            if re.search(pattern, text, re.IGNORECASE | re.DOTALL):
-                return False
-
-        return True
+        # 检查危险标签和脚本（所有模式合并为一个正则，单次扫描）
+        return not ValidationUtils.XSS_REGEX.search(text)
 
     @staticmethod
     def validate_with_custom_rule(value: Any, rule: Callable[[Any], bool], error_msg: str = "验证失败") -> tuple[bool, str]:
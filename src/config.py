@@ -3,10 +3,14 @@
 加载和管理 Agent 配置
 """
 
-import json
 import os
 from typing import Dict, Any, Optional
 
+from common.json_utils import json_loads
+
+# 查找缓存中表示“键不存在”的标记
+_MISSING = object()
+
 
 class Config:
     """配置管理器"""
@@ -16,6 +20,8 @@ class Config:
     def __init__(self, config_path: str = "config/config.json"):
         self.config_path = config_path
         self._config: Dict[str, Any] = {}
+        # 点分隔键 -> 查找结果，load/set 时清空
+        self._lookup_cache: Dict[str, Any] = {}
         self.load()
 
     @classmethod
@@ -27,26 +33,33 @@ class Config:
 
     def load(self):
         """加载配置文件"""
+        self._lookup_cache.clear()
         if os.path.exists(self.config_path):
-            with open(self.config_path, "r") as f:
-                self._config = json.load(f)
+            # orjson 可用时加速解析，行为与标准库不一致的输入自动回退
+            with open(self.config_path, "rb") as f:
+                self._config = json_loads(f.read())
         else:
             print(f"Warning: Config file '{self.config_path}' not found")
             self._config = {}
 
     def get(self, key: str, default: Any = None) -> Any:
         """获取配置值（支持点分隔符，如 'model.name'）"""
-        keys = key.split('.')
-        value = self._config
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        return value
+        try:
+            value = self._lookup_cache[key]
+        except KeyError:
+            value = self._config
+            for k in key.split('.'):
+                if isinstance(value, dict) and k in value:
+                    value = value[k]
+                else:
+                    value = _MISSING
+                    break
+            self._lookup_cache[key] = value
+        return default if value is _MISSING else value
 
     def set(self, key: str, value: Any):
         """设置配置值"""
+        self._lookup_cache.clear()
         keys = key.split('.')
         config = self._config
         for k in keys[:-1]:
@@ -70,3 +83,7 @@ class Config:
     def get_tools_config(self) -> Dict[str, Any]:
         """获取工具配置"""
         return self.get("tools", {})
+
+    def get_rag_config(self) -> Dict[str, Any]:
+        """获取 RAG 配置"""
+        return self.get("rag", {})
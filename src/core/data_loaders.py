@@ -11,20 +11,28 @@
 """
 
 import os
-import json
-import yaml
 import re
+import time
+import pickle
+import hashlib
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Union, Iterator
 from abc import ABC, abstractmethod
 from pathlib import Path
 import logging
 
+from common.json_utils import json_loads
+
 logger = logging.getLogger(__name__)
 
 
 class Document:
     """文档类"""
 
+    # 向量存储和文档缓存中会保存大量文档，使用 __slots__ 省去每个实例的 __dict__
+    __slots__ = ("content", "metadata", "source", "doc_type", "page_content")
+
     def __init__(
         self,
         content: str,
@@ -61,14 +69,185 @@ class Document:
         )
 
 
+class DocumentCache:
+    """文档磁盘缓存
+
+    以 (文件路径, 修改时间, 文件大小) 为键缓存解析后的文档，文件未变化时
+    重新加载可跳过读取和解析。每个条目保存为缓存目录下的一个 pickle 文件，
+    条目文件的修改时间即最近访问时间，用于过期（TTL）和 LRU 淘汰。
+    """
+
+    DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ollama-agent", "documents")
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_entries: int = 1024,
+        ttl: float = 7 * 24 * 3600
+    ):
+        self.cache_dir = cache_dir or self.DEFAULT_DIR
+        self.max_entries = max_entries
+        self.ttl = ttl
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # 条目数估计（每次写入加一，可能偏大），超过容量时才扫描目录淘汰，
+        # 避免每次写入都遍历整个缓存目录
+        self._entry_count: Optional[int] = None
+
+    def _entry_path(self, source: str, namespace: str) -> Optional[str]:
+        """计算缓存条目路径，文件不存在时返回 None"""
+        try:
+            st = os.stat(source)
+        except OSError:
+            return None
+        raw = f"{namespace}\0{os.path.realpath(source)}\0{st.st_mtime_ns}\0{st.st_size}"
+        return os.path.join(self.cache_dir, hashlib.sha256(raw.encode()).hexdigest() + ".pkl")
+
+    def get(self, source: str, namespace: str = "") -> Optional[List[Document]]:
+        """读取缓存
+
+        Args:
+            source: 源文件路径
+            namespace: 命名空间（区分不同加载器）
+
+        Returns:
+            文档列表，未命中或已过期返回 None
+        """
+        entry = self._entry_path(source, namespace)
+        if entry is None:
+            return None
+        try:
+            if time.time() - os.path.getmtime(entry) > self.ttl:
+                os.remove(entry)
+                return None
+            with open(entry, 'rb') as f:
+                documents = pickle.load(f)
+            os.utime(entry)  # 刷新最近访问时间
+            return documents
+        except (OSError, pickle.PickleError, EOFError, AttributeError):
+            return None
+
+    def set(self, source: str, documents: List[Document], namespace: str = ""):
+        """写入缓存
+
+        Args:
+            source: 源文件路径
+            documents: 文档列表
+            namespace: 命名空间（区分不同加载器）
+        """
+        entry = self._entry_path(source, namespace)
+        if entry is None:
+            return
+        tmp_path = f"{entry}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(documents, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry)
+        except Exception as e:
+            # 含不可序列化的元数据等情况：缓存只是加速手段，不影响加载结果
+            logger.warning(f"写入文档缓存失败 {source}: {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        if self._entry_count is None:
+            self._evict()
+        else:
+            self._entry_count += 1
+            if self._entry_count > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """淘汰过期条目，并在超出容量时删除最久未访问的条目"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for e in it:
+                if e.name.endswith(".pkl"):
+                    try:
+                        entries.append((e.stat().st_mtime, e.path))
+                    except OSError:
+                        pass  # 已被并发的淘汰删除
+        self._entry_count = len(entries)
+        if len(entries) <= self.max_entries:
+            return
+
+        # 过期条目必然是最旧的一批，因此只需选出最旧的 max(超出数, 过期数) 个，无需全量排序
+        expire_before = time.time() - self.ttl
+        expired = sum(1 for mtime, _ in entries if mtime < expire_before)
+        remove_count = max(len(entries) - self.max_entries, expired)
+        for _, path in heapq.nsmallest(remove_count, entries):
+            try:
+                os.remove(path)
+                self._entry_count -= 1
+            except OSError:
+                pass
+
+    def clear(self):
+        """清空缓存"""
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".pkl"):
+                    os.remove(entry.path)
+        self._entry_count = 0
+
+
 class BaseDataLoader(ABC):
     """数据加载器基类"""
 
+    # 可选的文档磁盘缓存（由 DataLoaderManager.set_cache 设置）
+    cache: Optional[DocumentCache] = None
+
     @abstractmethod
     def load(self, source: str) -> List[Document]:
         """加载数据"""
         pass
 
+    # 元数据中记录源文件路径的键，缓存命中时改写为本次调用方传入的路径
+    SOURCE_METADATA_KEYS = ("source", "file_path")
+
+    def _cache_settings(self) -> Optional[tuple]:
+        """影响加载结果的加载器设置，参与缓存键计算
+
+        Returns:
+            可稳定 repr 的设置元组；返回 None 表示当前设置无法可靠地作为键，不使用缓存
+        """
+        return ()
+
+    @staticmethod
+    def _callable_key(func: Any) -> Optional[str]:
+        """可调用对象的稳定标识（模块 + 限定名），lambda 和局部函数返回 None"""
+        qualname = getattr(func, "__qualname__", None)
+        if not qualname or "<" in qualname:
+            return None
+        return f"{getattr(func, '__module__', '')}.{qualname}"
+
+    def load_cached(self, source: str) -> List[Document]:
+        """加载数据，单个文件优先从磁盘缓存读取（未配置缓存时等同于 load）"""
+        if self.cache is None or not os.path.isfile(source):
+            return self.load(source)
+
+        settings = self._cache_settings()
+        if settings is None:
+            return self.load(source)
+
+        namespace = f"{type(self).__name__}{settings!r}"
+        documents = self.cache.get(source, namespace)
+        if documents is None:
+            documents = self.load(source)
+            self.cache.set(source, documents, namespace)
+            return documents
+
+        # 缓存以真实路径为键，同一文件可能以不同写法的路径写入缓存
+        for doc in documents:
+            doc.source = source
+            for key in self.SOURCE_METADATA_KEYS:
+                if key in doc.metadata:
+                    doc.metadata[key] = source
+            if "file_name" in doc.metadata:
+                doc.metadata["file_name"] = os.path.basename(source)
+        return documents
+
     def load_and_split(
         self,
         source: str,
@@ -129,6 +308,15 @@ class TextFileLoader(BaseDataLoader):
         self.encoding = encoding
         self.metadata_extractors = metadata_extractors or {}
 
+    def _cache_settings(self) -> Optional[tuple]:
+        extractors = []
+        for name, func in self.metadata_extractors.items():
+            key = self._callable_key(func)
+            if key is None:
+                return None
+            extractors.append((name, key))
+        return (self.encoding, tuple(extractors))
+
     def load(self, source: str) -> List[Document]:
         """加载文本文件"""
         try:
@@ -185,22 +373,32 @@ class DirectoryLoader(BaseDataLoader):
         self,
         extensions: Optional[List[str]] = None,
         recursive: bool = True,
-        exclude_patterns: Optional[List[str]] = None
+        exclude_patterns: Optional[List[str]] = None,
+        max_workers: Optional[int] = None
     ):
         self.extensions = extensions or ['.txt', '.md', '.py', '.json', '.yaml', '.yml']
         self.recursive = recursive
+        # 并行读取文件的线程数，默认 CPU 核数的 4 倍（不超过 32）
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        # 读取文件的线程池，首次加载时创建，之后各次加载复用
+        self._executor: Optional[ThreadPoolExecutor] = None
         self.exclude_patterns = exclude_patterns or [
             '__pycache__', '.git', '.pytest_cache', 'node_modules',
             'venv', 'env', '.env', '*.pyc', '*.pyo'
         ]
 
     def load(self, source: str) -> List[Document]:
-        """加载目录中的所有文件"""
+        """加载目录中的所有文件
+
+        先遍历目录收集文件，再把各文件的读取分发到线程池，
+        结果按遍历顺序合并。
+        """
         if not os.path.exists(source) or not os.path.isdir(source):
             raise ValueError(f"目录不存在: {source}")
 
-        documents = []
         file_loader = TextFileLoader()
+        file_loader.cache = self.cache
+        file_paths = []
 
         for root, dirs, files in os.walk(source):
             # 过滤目录
@@ -217,15 +415,34 @@ class DirectoryLoader(BaseDataLoader):
                 if ext not in self.extensions:
                     continue
 
-                try:
-                    docs = file_loader.load(file_path)
-                    documents.extend(docs)
-                except Exception as e:
-                    logger.warning(f"加载文件失败 {file_path}: {str(e)}")
+                file_paths.append(file_path)
+
+        def load_file(file_path: str) -> List[Document]:
+            try:
+                return file_loader.load_cached(file_path)
+            except Exception as e:
+                logger.warning(f"加载文件失败 {file_path}: {str(e)}")
+                return []
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="directory-loader"
+            )
+
+        documents = []
+        for docs in self._executor.map(load_file, file_paths):
+            documents.extend(docs)
 
         logger.info(f"从目录 {source} 加载了 {len(documents)} 个文档")
         return documents
 
+    def close(self):
+        """关闭读取文件的线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
     def _should_exclude(self, name: str) -> bool:
         """判断是否应该排除"""
         for pattern in self.exclude_patterns:
@@ -248,11 +465,15 @@ class JSONLoader(BaseDataLoader):
         self.text_fields = text_fields or ["content", "text", "description"]
         self.metadata_fields = metadata_fields or ["title", "author", "date"]
 
+    def _cache_settings(self) -> Optional[tuple]:
+        return (tuple(self.text_fields), tuple(self.metadata_fields))
+
     def load(self, source: str) -> List[Document]:
         """加载 JSON 文件"""
         try:
-            with open(source, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # orjson 可用时加速解析，行为与标准库不一致的输入自动回退
+            with open(source, 'rb') as f:
+                data = json_loads(f.read())
 
             documents = []
             if isinstance(data, list):
@@ -278,10 +499,7 @@ class JSONLoader(BaseDataLoader):
     ) -> Optional[Document]:
         """从 JSON 项创建文档"""
         # 提取文本内容
-        content = ""
-        for field in self.text_fields:
-            if field in item:
-                content += str(item[field]) + "\n"
+        content = "\n".join(str(item[field]) for field in self.text_fields if field in item)
 
         if not content.strip():
             return None
@@ -307,13 +525,17 @@ class YAMLLoader(BaseDataLoader):
 
     def load(self, source: str) -> List[Document]:
         """加载 YAML 文件"""
+        # PyYAML 导入较慢，只在真正加载 YAML 时才导入
+        import yaml
+
         try:
             with open(source, 'r', encoding='utf-8') as f:
                 data = yaml.safe_load(f)
 
             # 转换为 JSON 格式处理
             json_loader = JSONLoader()
-            return json_loader._create_document_from_item(data, source)
+            doc = json_loader._create_document_from_item(data, source)
+            return [doc] if doc is not None else []
 
         except Exception as e:
             logger.error(f"加载 YAML 文件失败 {source}: {str(e)}")
@@ -364,6 +586,7 @@ class MarkdownLoader(BaseDataLoader):
             try:
                 end = content.find('---', 3)
                 if end != -1:
+                    import yaml
                     frontmatter = content[3:end].strip()
                     metadata.update(yaml.safe_load(frontmatter))
             except Exception as e:
@@ -402,6 +625,9 @@ class CSVLoader(BaseDataLoader):
         self.metadata_columns = metadata_columns or []
         self.delimiter = delimiter
 
+    def _cache_settings(self) -> Optional[tuple]:
+        return (tuple(self.text_columns), tuple(self.metadata_columns), self.delimiter)
+
     def load(self, source: str) -> List[Document]:
         """加载 CSV 文件"""
         try:
@@ -458,8 +684,15 @@ class DataLoaderManager:
         'csv': CSVLoader
     }
 
-    def __init__(self):
+    def __init__(self, cache: Optional[DocumentCache] = None):
         self._loader_instances = {}
+        self.cache = cache
+
+    def set_cache(self, cache: Optional[DocumentCache]):
+        """设置文档磁盘缓存（None 表示关闭）"""
+        self.cache = cache
+        for loader in self._loader_instances.values():
+            loader.cache = cache
 
     def get_loader(self, loader_type: str, **kwargs) -> BaseDataLoader:
         """获取加载器实例"""
@@ -468,7 +701,9 @@ class DataLoaderManager:
 
         if loader_type not in self._loader_instances:
             loader_class = self.LOADERS[loader_type]
-            self._loader_instances[loader_type] = loader_class(**kwargs)
+            loader = loader_class(**kwargs)
+            loader.cache = self.cache
+            self._loader_instances[loader_type] = loader
 
         return self._loader_instances[loader_type]
 
@@ -493,7 +728,7 @@ class DataLoaderManager:
             loader_type = self._detect_loader_type(source)
 
         loader = self.get_loader(loader_type, **kwargs)
-        return loader.load(source)
+        return loader.load_cached(source)
 
     def _detect_loader_type(self, source: str) -> str:
         """自动检测加载器类型"""
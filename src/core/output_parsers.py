@@ -22,11 +22,16 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 用于从文本任意位置解码 JSON 对象
+_JSON_DECODER = json.JSONDecoder()
+
 
 @dataclass
 class ParsedOutput:
     """解析结果"""
 
+    __slots__ = ("data", "format", "confidence", "raw_output", "metadata")
+
     data: Any
     format: str
     confidence: float
@@ -37,6 +42,9 @@ class ParsedOutput:
 class BaseOutputParser(ABC):
     """输出解析器基类"""
 
+    # 代码块：语言标记 + 内容，内容止于下一个 ``` （每个代码块单独截取，不跨块回溯）
+    CODE_BLOCK_REGEX = re.compile(r'```(\w*)(.*?)```', re.DOTALL)
+
     @abstractmethod
     def parse(self, output: str) -> ParsedOutput:
         """解析输出"""
@@ -47,6 +55,26 @@ class BaseOutputParser(ABC):
         """获取格式说明"""
         pass
 
+    def _find_code_block(self, output: str, lang: str, open_char: str, close_char: str) -> Optional[str]:
+        """查找第一个内容以 open_char 开头、close_char 结尾的代码块
+
+        Args:
+            output: LLM 输出
+            lang: 允许的语言标记（无标记的代码块也接受）
+            open_char: 内容起始字符
+            close_char: 内容结束字符
+
+        Returns:
+            去除首尾空白后的代码块内容，未找到返回 None
+        """
+        for match in self.CODE_BLOCK_REGEX.finditer(output):
+            if match.group(1) not in ('', lang):
+                continue
+            body = match.group(2).strip()
+            if body.startswith(open_char) and body.endswith(close_char):
+                return body
+        return None
+
 
 class JSONOutputParser(BaseOutputParser):
     """JSON 输出解析器"""
@@ -86,14 +114,15 @@ class JSONOutputParser(BaseOutputParser):
     def _extract_json(self, output: str) -> Optional[str]:
         """提取 JSON 字符串"""
         # 尝试从代码块中提取
-        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', output, re.DOTALL)
-        if json_match:
-            return json_match.group(1)
+        json_block = self._find_code_block(output, 'json', '{', '}')
+        if json_block is not None:
+            return json_block
 
-        # 尝试直接提取
-        json_match = re.search(r'(\{.*\})', output, re.DOTALL)
-        if json_match:
-            return json_match.group(1)
+        # 尝试直接提取（第一个 '{' 到最后一个 '}'）
+        start = output.find('{')
+        end = output.rfind('}')
+        if start != -1 and end > start:
+            return output[start:end + 1]
 
         return None
 
@@ -105,6 +134,10 @@ class JSONOutputParser(BaseOutputParser):
 class ToolCallParser(BaseOutputParser):
     """工具调用解析器"""
 
+    # 预编译正则
+    TOOL_NAME_REGEX = re.compile(r'工具\s*名\s*[:：]\s*(\w+)')
+    TOOL_ARG_REGEX = re.compile(r'(\w+)\s*[:：]\s*([^\n,]+)')
+
     def __init__(self):
         self.required_fields = ["name", "arguments"]
 
@@ -141,36 +174,43 @@ class ToolCallParser(BaseOutputParser):
 
     def _extract_tool_call(self, output: str) -> Optional[Dict[str, Any]]:
         """提取工具调用"""
-        # 尝试 JSON 格式
-        json_match = re.search(r'```(?:json)?\s*(\{.*?"name".*?"arguments".*?\})\s*```', output, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group(1))
-            except:
-                pass
-
-        # 尝试直接 JSON
-        json_match = re.search(r'(\{.*?"name".*?"arguments".*?\})', output, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group(1))
-            except:
-                pass
+        # 尝试 JSON 格式（代码块内外均可）
+        tool_call = self._scan_json_tool_call(output)
+        if tool_call is not None:
+            return tool_call
 
         # 尝试结构化文本格式
         return self._extract_structured_text(output)
 
+    def _scan_json_tool_call(self, output: str) -> Optional[Dict[str, Any]]:
+        """从左到右扫描文本，返回第一个含 name 和 arguments 的 JSON 对象
+
+        每个 '{' 处直接用 JSON 解码器尝试解码，成功解码的对象整体跳过，
+        不使用多段非贪婪匹配的正则，避免回溯，也能正确处理嵌套的大括号。
+        """
+        pos = output.find('{')
+        while pos != -1:
+            try:
+                obj, end = _JSON_DECODER.raw_decode(output, pos)
+            except (json.JSONDecodeError, RecursionError):
+                pos = output.find('{', pos + 1)
+                continue
+            if isinstance(obj, dict) and all(field in obj for field in self.required_fields):
+                return obj
+            pos = output.find('{', end)
+        return None
+
     def _extract_structured_text(self, output: str) -> Optional[Dict[str, Any]]:
         """从结构化文本中提取"""
         # 查找工具名
-        name_match = re.search(r'工具\s*名\s*[:：]\s*(\w+)', output)
+        name_match = self.TOOL_NAME_REGEX.search(output)
         if not name_match:
             return None
         name = name_match.group(1)
 
         # 查找参数
         args = {}
-        arg_matches = re.finditer(r'(\w+)\s*[:：]\s*([^\n,]+)', output)
+        arg_matches = self.TOOL_ARG_REGEX.finditer(output)
         for match in arg_matches:
             key, value = match.groups()
             if key != "name":  # 跳过工具名
@@ -202,6 +242,9 @@ class ToolCallParser(BaseOutputParser):
 class CSVOutputParser(BaseOutputParser):
     """CSV 输出解析器"""
 
+    # 预编译正则
+    CSV_BLOCK_REGEX = re.compile(r'```(?:csv)?\s*(\S.*?)\s*```', re.DOTALL)
+
     def parse(self, output: str) -> ParsedOutput:
         """解析 CSV 输出"""
         try:
@@ -235,7 +278,7 @@ class CSVOutputParser(BaseOutputParser):
     def _extract_csv(self, output: str) -> Optional[str]:
         """提取 CSV 字符串"""
         # 查找 CSV 代码块
-        csv_match = re.search(r'```(?:csv)?\s*(\S.*?)\s*```', output, re.DOTALL)
+        csv_match = self.CSV_BLOCK_REGEX.search(output)
         if csv_match:
             return csv_match.group(1)
 
@@ -268,6 +311,15 @@ class StructuredOutputParser(BaseOutputParser):
 
     def __init__(self, schema: Dict[str, Type]):
         self.schema = schema
+        # 每个字段的匹配模式只依赖 schema，构造时编译一次
+        self._field_patterns = {
+            field: [
+                re.compile(rf'{field}\s*[:：]\s*([^\n]+)', re.IGNORECASE),
+                re.compile(rf'{field}\s*=\s*([^\n]+)', re.IGNORECASE),
+                re.compile(rf'{field}\s+([^\n]+)', re.IGNORECASE)
+            ]
+            for field in schema
+        }
 
     def parse(self, output: str) -> ParsedOutput:
         """解析结构化输出"""
@@ -311,14 +363,8 @@ class StructuredOutputParser(BaseOutputParser):
         # 尝试从文本中提取字段
         for field, field_type in self.schema.items():
             # 查找字段值
-            patterns = [
-                rf'{field}\s*[:：]\s*([^\n]+)',
-                rf'{field}\s*=\s*([^\n]+)',
-                rf'{field}\s+([^\n]+)'
-            ]
-
-            for pattern in patterns:
-                match = re.search(pattern, output, re.IGNORECASE)
+            for pattern in self._field_patterns[field]:
+                match = pattern.search(output)
                 if match:
                     value = match.group(1).strip()
 
@@ -343,10 +389,7 @@ class StructuredOutputParser(BaseOutputParser):
 
     def _extract_json(self, output: str) -> Optional[str]:
         """提取 JSON"""
-        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', output, re.DOTALL)
-        if json_match:
-            return json_match.group(1)
-        return None
+        return self._find_code_block(output, 'json', '{', '}')
 
     def _validate_types(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """验证数据类型"""
@@ -373,6 +416,10 @@ class StructuredOutputParser(BaseOutputParser):
 class ListOutputParser(BaseOutputParser):
     """列表输出解析器"""
 
+    # 预编译正则
+    NUMBERED_ITEM_REGEX = re.compile(r'^\s*\d+[.)\s]+(.+)$', re.MULTILINE)
+    BULLET_ITEM_REGEX = re.compile(r'^\s*[-*•]\s+(.+)$', re.MULTILINE)
+
     def __init__(self, item_type: Type = str):
         self.item_type = item_type
 
@@ -429,12 +476,12 @@ class ListOutputParser(BaseOutputParser):
         items = []
 
         # 匹配编号列表
-        numbered_items = re.findall(r'^\s*\d+[.)\s]+(.+)$', output, re.MULTILINE)
+        numbered_items = self.NUMBERED_ITEM_REGEX.findall(output)
         if numbered_items:
             return numbered_items
 
         # 匹配符号列表
-        bullet_items = re.findall(r'^\s*[-*•]\s+(.+)$', output, re.MULTILINE)
+        bullet_items = self.BULLET_ITEM_REGEX.findall(output)
         if bullet_items:
             return bullet_items
 
@@ -451,10 +498,7 @@ class ListOutputParser(BaseOutputParser):
 
     def _extract_json(self, output: str) -> Optional[str]:
         """提取 JSON"""
-        json_match = re.search(r'```(?:json)?\s*(\[.*?\])\s*```', output, re.DOTALL)
-        if json_match:
-            return json_match.group(1)
-        return None
+        return self._find_code_block(output, 'json', '[', ']')
 
     def get_format_instructions(self) -> str:
         """获取格式说明"""
@@ -464,13 +508,25 @@ class ListOutputParser(BaseOutputParser):
 class OutputParserManager:
     """输出解析器管理器"""
 
+    PARSERS = {
+        'json': JSONOutputParser,
+        'tool_call': ToolCallParser,
+        'csv': CSVOutputParser,
+        'list': ListOutputParser,
+    }
+
     def __init__(self):
-        self.parsers = {
-            'json': JSONOutputParser(),
-            'tool_call': ToolCallParser(),
-            'csv': CSVOutputParser(),
-            'list': ListOutputParser(),
-        }
+        # 解析器实例在首次使用时创建
+        self.parsers: Dict[str, BaseOutputParser] = {}
+
+    def get_parser(self, parser_type: str) -> BaseOutputParser:
+        """获取解析器实例"""
+        parser = self.parsers.get(parser_type)
+        if parser is None:
+            if parser_type not in self.PARSERS:
+                raise ValueError(f"不支持的解析器类型: {parser_type}")
+            parser = self.parsers[parser_type] = self.PARSERS[parser_type]()
+        return parser
 
     def parse(
         self,
@@ -479,10 +535,7 @@ class OutputParserManager:
         **kwargs
     ) -> ParsedOutput:
         """解析输出"""
-        if parser_type not in self.parsers:
-            raise ValueError(f"不支持的解析器类型: {parser_type}")
-
-        parser = self.parsers[parser_type]
+        parser = self.get_parser(parser_type)
 
         # 如果是结构化解析器，需要传入 schema
         if parser_type == 'structured':
@@ -501,14 +554,14 @@ class OutputParserManager:
             schema = kwargs.get('schema', {})
             return StructuredOutputParser(schema).get_format_instructions()
 
-        if parser_type in self.parsers:
-            return self.parsers[parser_type].get_format_instructions()
+        if parser_type in self.parsers or parser_type in self.PARSERS:
+            return self.get_parser(parser_type).get_format_instructions()
 
         return "未知格式"
 
     def list_parsers(self) -> List[str]:
         """列出所有解析器"""
-        return list(self.parsers.keys())
+        return list(dict.fromkeys([*self.PARSERS, *self.parsers]))
 
 
 # 全局解析器管理器实例
@@ -520,7 +573,7 @@ def get_output_parser(parser_type: str, **kwargs) -> BaseOutputParser:
     if parser_type == 'structured':
         schema = kwargs.get('schema', {})
         return StructuredOutputParser(schema)
-    return parser_manager.parsers[parser_type]
+    return parser_manager.get_parser(parser_type)
 
 
 def parse_output(output: str, parser_type: str = 'json', **kwargs) -> ParsedOutput:
@@ -5,6 +5,7 @@
 """
 
 import json
+import re
 from typing import Dict, Any, List, Optional, Union
 from abc import ABC, abstractmethod
 
@@ -12,6 +13,9 @@ from abc import ABC, abstractmethod
 class BasePromptTemplate(ABC):
     """Prompt 模板基类"""
 
+    # 预编译的模板变量正则
+    VARIABLE_REGEX = re.compile(r'\{(\w+)\}')
+
     @abstractmethod
     def format(self, **kwargs) -> str:
         """格式化 Prompt"""
@@ -38,8 +42,7 @@ class StaticPromptTemplate(BasePromptTemplate):
 
     def get_variables(self) -> List[str]:
         """获取需要的变量"""
-        import re
-        return re.findall(r'\{(\w+)\}', self.template)
+        return self.VARIABLE_REGEX.findall(self.template)
 
 
 class DynamicPromptTemplate(BasePromptTemplate):
@@ -90,8 +93,7 @@ class ContextAwarePromptTemplate(BasePromptTemplate):
 
     def get_variables(self) -> List[str]:
         """获取需要的变量"""
-        import re
-        return re.findall(r'\{(\w+)\}', self.base_template)
+        return self.VARIABLE_REGEX.findall(self.base_template)
 
 
 class PromptManager:
@@ -404,12 +406,12 @@ class PromptEnhancer:
         if not examples:
             return prompt
 
-        example_section = "\n\n示例:\n"
+        parts = [prompt, "\n\n示例:\n"]
         for i, example in enumerate(examples, 1):
-            example_section += f"{i}. 输入: {example['input']}\n"
-            example_section += f"   输出: {example['output']}\n"
+            parts.append(f"{i}. 输入: {example['input']}\n")
+            parts.append(f"   输出: {example['output']}\n")
 
-        return prompt + example_section
+        return "".join(parts)
 
     @staticmethod
     def add_constraints(prompt: str, constraints: List[str]) -> str:
@@ -417,11 +419,10 @@ class PromptEnhancer:
         if not constraints:
             return prompt
 
-        constraint_section = "\n\n约束条件:\n"
-        for constraint in constraints:
-            constraint_section += f"- {constraint}\n"
+        parts = [prompt, "\n\n约束条件:\n"]
+        parts.extend(f"- {constraint}\n" for constraint in constraints)
 
-        return prompt + constraint_section
+        return "".join(parts)
 
     @staticmethod
     def add_format_instructions(prompt: str, format_type: str = "json") -> str:
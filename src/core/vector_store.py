@@ -14,20 +14,36 @@
 import os
 import json
 import math
+import asyncio
+import heapq
 import pickle
-from typing import List, Dict, Any, Optional, Tuple
+import re
+from typing import List, Dict, Any, Optional, Tuple, Union
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from operator import itemgetter
 import logging
 
+# numpy 可选，用于大规模向量存储的批量相似度计算
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 logger = logging.getLogger(__name__)
 
+# 候选文档数超过该值时才使用 numpy（小规模时数组转换开销大于收益）
+NUMPY_MIN_DOCUMENTS = 1000
+
 
 @dataclass
 class SearchResult:
     """搜索结果"""
 
+    # 每次检索都会创建多个结果对象，使用 __slots__ 减少内存占用
+    __slots__ = ("document", "score", "metadata", "source")
+
     document: Any  # Document 对象
     score: float  # 相似度分数
     metadata: Dict[str, Any]  # 元数据
@@ -45,6 +61,10 @@ class SearchResult:
 class EmbeddingFunction(ABC):
     """向量嵌入函数基类"""
 
+    # 是否为真正的语义向量：只有语义向量才能用余弦距离判断两个问题是否同义，
+    # 字符/词频类的简化嵌入在不相关的问题之间也会给出很高的相似度
+    semantic = False
+
     @abstractmethod
     def embed(self, text: str) -> List[float]:
         """将文本转换为向量"""
@@ -58,6 +78,9 @@ class EmbeddingFunction(ABC):
 class TFIDFEmbedding(EmbeddingFunction):
     """TF-IDF 向量嵌入（简化版）"""
 
+    # 分词：文档入库和每次查询都会调用，预编译避免重复查找正则缓存
+    TOKEN_REGEX = re.compile(r'\w+')
+
     def __init__(self, vocabulary: Optional[Dict[str, int]] = None):
         self.vocabulary = vocabulary or {}
         self.doc_count = 0
@@ -86,8 +109,7 @@ class TFIDFEmbedding(EmbeddingFunction):
 
     def _tokenize(self, text: str) -> List[str]:
         """简单的分词"""
-        import re
-        return re.findall(r'\w+', text.lower())
+        return self.TOKEN_REGEX.findall(text.lower())
 
 
 class SimpleEmbedding(EmbeddingFunction):
@@ -97,7 +119,7 @@ class SimpleEmbedding(EmbeddingFunction):
         """字符频率向量"""
         # 使用字符频率作为简化的 embedding
         char_set = set(text.lower())
-        vector = [1.0 if c in text.lower() else 0.0 for c in 'abcdefghijklmnopqrstuvwxyz']
+        vector = [1.0 if c in char_set else 0.0 for c in 'abcdefghijklmnopqrstuvwxyz']
         return vector
 
 
@@ -144,6 +166,13 @@ class InMemoryVectorStore(BaseVectorStore):
         self.embeddings = []  # 存储向量
         self.metadatas = []  # 存储元数据
         self.ids = []  # 存储 ID
+        self._total_characters = 0  # 文档总字符数，随增删增量维护
+        self._unit_matrix = None  # 按行归一化的向量矩阵（numpy），文档变化时失效
+
+    @staticmethod
+    def _content_length(doc: Any) -> int:
+        """文档内容长度，无 content 属性时为 0"""
+        return len(doc.content) if hasattr(doc, 'content') else 0
 
     def add(
         self,
@@ -162,9 +191,11 @@ class InMemoryVectorStore(BaseVectorStore):
                 raise ValueError(f"向量维度不匹配: 期望 {self.dimension}, 得到 {len(embedding)}")
 
         # 添加到存储
+        self._unit_matrix = None
         start_id = len(self.documents)
         for i, (doc, embedding) in enumerate(zip(documents, embeddings)):
             self.documents.append(doc)
+            self._total_characters += self._content_length(doc)
             self.embeddings.append(embedding)
             self.metadatas.append(doc.metadata if hasattr(doc, 'metadata') else {})
             self.ids.append(start_id + i)
@@ -184,21 +215,21 @@ class InMemoryVectorStore(BaseVectorStore):
         # 查询向量
         query_embedding = self.embedding_function.embed(query)
 
-        # 计算相似度
-        scores = []
-        for i, embedding in enumerate(self.embeddings):
-            # 应用过滤器
-            if filter and not self._match_filter(self.metadatas[i], filter):
-                continue
+        # 应用过滤器
+        if filter:
+            candidates = [i for i, metadata in enumerate(self.metadatas) if self._match_filter(metadata, filter)]
+        else:
+            candidates = range(len(self.documents))
 
-            # 计算余弦相似度
-            score = self._cosine_similarity(query_embedding, embedding)
-            scores.append((i, score))
+        if np is not None and len(candidates) >= NUMPY_MIN_DOCUMENTS:
+            top = self._top_k_numpy(query_embedding, k, candidates)
+        else:
+            # 计算余弦相似度，只选出 top-k，无需对全部结果排序
+            scores = [(i, self._cosine_similarity(query_embedding, self.embeddings[i])) for i in candidates]
+            top = heapq.nlargest(k, scores, key=itemgetter(1))
 
-        # 排序并返回 top-k
-        scores.sort(key=lambda x: x[1], reverse=True)
         results = []
-        for i, score in scores[:k]:
+        for i, score in top:
             results.append(SearchResult(
                 document=self.documents[i],
                 score=score,
@@ -215,6 +246,40 @@ class InMemoryVectorStore(BaseVectorStore):
                 return False
         return True
 
+    def _top_k_numpy(self, query_embedding: List[float], k: int, candidates) -> List[Tuple[int, float]]:
+        """使用 numpy 批量计算余弦相似度并选出 top-k
+
+        Args:
+            query_embedding: 查询向量
+            k: 返回数量
+            candidates: 候选文档下标
+
+        Returns:
+            按分数降序排列的 (下标, 分数) 列表
+        """
+        if k <= 0:
+            return []
+
+        if self._unit_matrix is None:
+            matrix = np.asarray(self.embeddings, dtype=np.float64)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0  # 零向量保持为零，相似度为 0
+            self._unit_matrix = matrix / norms
+
+        indices = np.asarray(candidates, dtype=np.intp)
+        query = np.asarray(query_embedding, dtype=np.float64)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            scores = np.zeros(len(indices))
+        else:
+            scores = self._unit_matrix[indices] @ (query / query_norm)
+
+        # argpartition 选出 top-k（O(n)），再只对这 k 个排序
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(indices[j]), float(scores[j])) for j in top]
+
     def _cosine_similarity(self, a: List[float], b: List[float]) -> float:
         """计算余弦相似度"""
         dot_product = sum(x * y for x, y in zip(a, b))
@@ -234,8 +299,16 @@ class InMemoryVectorStore(BaseVectorStore):
             'dimension': self.dimension
         }
 
-        with open(path, 'wb') as f:
-            pickle.dump(data, f)
+        # 先写临时文件再原子替换，避免写入中途崩溃留下损坏的存储文件
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(data, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
         logger.info(f"向量存储已保存到 {path}")
 
@@ -252,6 +325,8 @@ class InMemoryVectorStore(BaseVectorStore):
         self.metadatas = data['metadatas']
         self.ids = data['ids']
         self.dimension = data.get('dimension', 26)
+        self._unit_matrix = None
+        self._total_characters = sum(self._content_length(doc) for doc in self.documents)
 
         logger.info(f"从 {path} 加载了 {len(self.documents)} 个文档")
 
@@ -261,6 +336,8 @@ class InMemoryVectorStore(BaseVectorStore):
         keep_indices = [i for i, doc_id in enumerate(self.ids) if doc_id not in id_set]
 
         self.documents = [self.documents[i] for i in keep_indices]
+        self._total_characters = sum(self._content_length(doc) for doc in self.documents)
+        self._unit_matrix = None
         self.embeddings = [self.embeddings[i] for i in keep_indices]
         self.metadatas = [self.metadatas[i] for i in keep_indices]
         self.ids = [self.ids[i] for i in keep_indices]
@@ -270,10 +347,193 @@ class InMemoryVectorStore(BaseVectorStore):
         return {
             "document_count": len(self.documents),
             "dimension": self.dimension,
-            "total_characters": sum(len(doc.content) if hasattr(doc, 'content') else 0 for doc in self.documents)
+            "total_characters": self._total_characters
         }
 
 
+class QueryCache:
+    """精确查询缓存
+
+    以规范化后的问题文本（小写、合并空白）为键，容量满时按 LRU 淘汰。
+    未配置语义嵌入时 RAGSystem 使用它代替 ProximityCache。
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """初始化缓存
+
+        Args:
+            capacity: 最大缓存条目数
+        """
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        """规范化问题文本"""
+        return " ".join(question.lower().split())
+
+    def lookup(self, question: str) -> Optional[Any]:
+        """查找缓存值
+
+        Args:
+            question: 问题文本
+
+        Returns:
+            命中时返回缓存值，否则返回 None
+        """
+        key = self.normalize(question)
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def insert(self, question: str, value: Any):
+        """写入缓存
+
+        Args:
+            question: 问题文本
+            value: 缓存值
+        """
+        key = self.normalize(question)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
+
+
+class ProximityCache:
+    """近似查询缓存
+
+    以查询向量为键：新查询与某个已缓存查询的余弦距离不超过 tolerance 时
+    视为命中，直接返回缓存结果，跳过向量检索和 LLM 生成。
+    容量满时按 LRU 淘汰。
+
+    只适用于语义嵌入（EmbeddingFunction.semantic 为 True），
+    否则不同的问题也会命中同一条缓存。
+    """
+
+    def __init__(self, capacity: int = 1024, tolerance: float = 0.05):
+        """初始化缓存
+
+        Args:
+            capacity: 最大缓存条目数
+            tolerance: 命中阈值（余弦距离，1 - 相似度）
+        """
+        self.capacity = capacity
+        self.tolerance = tolerance
+        self._entries: "OrderedDict[int, Tuple[List[float], Any]]" = OrderedDict()
+        self._next_key = 0
+        # numpy 查找用的 (键列表, 单位向量矩阵)，条目变化时失效
+        self._matrix: Optional[Tuple[List[int], Any]] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[List[float]]:
+        """归一化向量，零向量返回 None"""
+        norm = sum(x * x for x in embedding) ** 0.5
+        if norm == 0:
+            return None
+        return [x / norm for x in embedding]
+
+    def _nearest(self, unit: List[float]) -> Tuple[Optional[int], float]:
+        """查找与给定单位向量最接近的缓存键"""
+        if np is not None and len(self._entries) >= NUMPY_MIN_DOCUMENTS:
+            if self._matrix is None:
+                keys = list(self._entries)
+                self._matrix = (keys, np.asarray([self._entries[k][0] for k in keys], dtype=np.float64))
+            keys, matrix = self._matrix
+            sims = matrix @ np.asarray(unit, dtype=np.float64)
+            best = int(np.argmax(sims))
+            return keys[best], float(sims[best])
+
+        best_key, best_sim = None, -1.0
+        for key, (cached, _) in self._entries.items():
+            sim = sum(x * y for x, y in zip(unit, cached))
+            if sim > best_sim:
+                best_key, best_sim = key, sim
+        return best_key, best_sim
+
+    def lookup(self, embedding: List[float]) -> Optional[Any]:
+        """查找近似命中的缓存值
+
+        Args:
+            embedding: 查询向量
+
+        Returns:
+            命中时返回缓存值，否则返回 None
+        """
+        unit = self._normalize(embedding)
+        if unit is None or not self._entries:
+            return None
+
+        key, sim = self._nearest(unit)
+        if 1 - sim > self.tolerance:
+            return None
+
+        self._entries.move_to_end(key)
+        return self._entries[key][1]
+
+    def insert(self, embedding: List[float], value: Any):
+        """写入缓存（已有近似条目时覆盖该条目）
+
+        Args:
+            embedding: 查询向量
+            value: 缓存值
+        """
+        unit = self._normalize(embedding)
+        if unit is None:
+            return
+
+        if self._entries:
+            key, sim = self._nearest(unit)
+            if 1 - sim <= self.tolerance:
+                self._entries[key] = (unit, value)
+                self._entries.move_to_end(key)
+                self._matrix = None
+                return
+
+        if len(self._entries) >= self.capacity:
+            self._entries.popitem(last=False)
+
+        self._entries[self._next_key] = (unit, value)
+        self._next_key += 1
+        self._matrix = None
+
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
+        self._matrix = None
+
+
+def create_query_cache(
+    embedding_function: EmbeddingFunction,
+    capacity: int = 1024,
+    tolerance: float = 0.05
+) -> Union[ProximityCache, QueryCache]:
+    """按嵌入函数创建查询缓存：语义嵌入使用近似缓存，否则按问题文本精确缓存
+
+    Args:
+        embedding_function: RAG 系统使用的嵌入函数
+        capacity: 最大缓存条目数
+        tolerance: 近似缓存的命中阈值
+
+    Returns:
+        查询缓存
+    """
+    if embedding_function.semantic:
+        return ProximityCache(capacity=capacity, tolerance=tolerance)
+    return QueryCache(capacity=capacity)
+
+
 class RAGSystem:
     """检索增强生成系统"""
 
@@ -281,22 +541,31 @@ class RAGSystem:
         self,
         vector_store: BaseVectorStore,
         embedding_function: Optional[EmbeddingFunction] = None,
-        llm: Optional[Any] = None
+        llm: Optional[Any] = None,
+        cache: Optional[Union[ProximityCache, QueryCache]] = None
     ):
         self.vector_store = vector_store
         self.embedding_function = embedding_function or SimpleEmbedding()
         self.llm = llm
+        if isinstance(cache, ProximityCache) and not self.embedding_function.semantic:
+            logger.warning("嵌入函数不是语义向量，近似查询缓存已改为按问题文本精确缓存")
+            cache = QueryCache(capacity=cache.capacity)
+        self.cache = cache
 
     def add_documents(self, documents: List[Any]):
         """添加文档到 RAG 系统"""
         self.vector_store.add(documents)
+        # 文档变化后缓存的答案可能过期
+        if self.cache is not None:
+            self.cache.clear()
 
     def query(
         self,
         question: str,
         k: int = 5,
         filter: Optional[Dict[str, Any]] = None,
-        rerank: bool = True
+        rerank: bool = True,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """回答问题
 
@@ -305,43 +574,158 @@ class RAGSystem:
             k: 返回文档数量
             filter: 元数据过滤器
             rerank: 是否重排序
+            use_cache: 是否查找查询缓存（结果总会写回缓存）
 
         Returns:
             包含问题和答案的字典
         """
-        # 1. 检索相关文档
-        relevant_docs = self.vector_store.similarity_search(question, k=k, filter=filter)
+        cache_key = self._cache_key(question, filter)
+        cached = self._cache_lookup(cache_key, question, k, use_cache)
+        if cached is not None:
+            return cached
+
+        result = self._query(question, k, filter)
+
+        if cache_key is not None:
+            self.cache.insert(cache_key, {"k": k, "result": result})
+
+        return result
+
+    async def aquery(
+        self,
+        question: str,
+        k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        rerank: bool = True,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """异步回答问题（不阻塞事件循环）
 
+        查询向量化和向量检索在线程池中执行，LLM 通过 llm.ainvoke 调用；
+        查询缓存的读写留在事件循环线程，并发查询不会同时修改缓存。
+
+        Args:
+            question: 问题
+            k: 返回文档数量
+            filter: 元数据过滤器
+            rerank: 是否重排序
+            use_cache: 是否查找查询缓存（结果总会写回缓存）
+
+        Returns:
+            包含问题和答案的字典
+        """
+        if isinstance(self.cache, ProximityCache):
+            cache_key = await asyncio.to_thread(self._cache_key, question, filter)
+        else:
+            cache_key = self._cache_key(question, filter)
+        cached = self._cache_lookup(cache_key, question, k, use_cache)
+        if cached is not None:
+            return cached
+
+        relevant_docs, context = await asyncio.to_thread(self._retrieve, question, k, filter)
+        if not relevant_docs:
+            result = self._empty_result(question)
+        else:
+            answer = await self._agenerate_answer(question, context, relevant_docs)
+            result = self._build_result(question, answer, context, relevant_docs)
+
+        if cache_key is not None:
+            self.cache.insert(cache_key, {"k": k, "result": result})
+
+        return result
+
+    def _cache_key(
+        self,
+        question: str,
+        filter: Optional[Dict[str, Any]]
+    ) -> Optional[Union[List[float], str]]:
+        """计算查询缓存键（仅缓存无过滤条件的查询）
+
+        Returns:
+            近似缓存的键为查询向量，精确缓存的键为问题文本；不使用缓存时为 None
+        """
+        if self.cache is None or filter is not None:
+            return None
+        if isinstance(self.cache, ProximityCache):
+            return self.embedding_function.embed(question)
+        return question
+
+    def _cache_lookup(
+        self,
+        cache_key: Optional[Union[List[float], str]],
+        question: str,
+        k: int,
+        use_cache: bool
+    ) -> Optional[Dict[str, Any]]:
+        """查找查询缓存
+
+        Returns:
+            命中的结果，未命中或不使用缓存时为 None
+        """
+        if cache_key is None or not use_cache:
+            return None
+        cached = self.cache.lookup(cache_key)
+        if cached is not None and cached["k"] == k:
+            logger.info(f"查询缓存命中: {question}")
+            return dict(cached["result"], question=question)
+        return None
+
+    def _query(
+        self,
+        question: str,
+        k: int,
+        filter: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """执行检索与生成（不经过缓存）"""
+        relevant_docs, context = self._retrieve(question, k, filter)
         if not relevant_docs:
-            return {
-                "question": question,
-                "answer": "抱歉，没有找到相关信息",
-                "context": "",
-                "relevant_documents": [],
-                "confidence": 0.0
-            }
-
-        # 2. 准备上下文
+            return self._empty_result(question)
+
+        answer = self._generate_answer(question, context, relevant_docs)
+        return self._build_result(question, answer, context, relevant_docs)
+
+    def _retrieve(
+        self,
+        question: str,
+        k: int,
+        filter: Optional[Dict[str, Any]]
+    ) -> Tuple[List[SearchResult], str]:
+        """检索相关文档并拼接上下文"""
+        relevant_docs = self.vector_store.similarity_search(question, k=k, filter=filter)
+
         context_parts = []
         for i, doc in enumerate(relevant_docs):
             doc_content = doc.document.content if hasattr(doc.document, 'content') else str(doc.document)
             doc_source = doc.source if hasattr(doc, 'source') else f"doc_{i}"
             context_parts.append(f"文档 {i+1} [{doc_source}]:\n{doc_content}")
 
-        context = "\n\n".join(context_parts)
+        return relevant_docs, "\n\n".join(context_parts)
 
-        # 3. 生成答案（这里使用简单模板，实际应调用 LLM）
-        answer = self._generate_answer(question, context, relevant_docs)
-
-        # 4. 计算置信度
-        confidence = self._calculate_confidence(relevant_docs)
+    @staticmethod
+    def _empty_result(question: str) -> Dict[str, Any]:
+        """没有检索到文档时的结果"""
+        return {
+            "question": question,
+            "answer": "抱歉，没有找到相关信息",
+            "context": "",
+            "relevant_documents": [],
+            "confidence": 0.0
+        }
 
+    def _build_result(
+        self,
+        question: str,
+        answer: str,
+        context: str,
+        relevant_docs: List[SearchResult]
+    ) -> Dict[str, Any]:
+        """组装查询结果"""
         return {
             "question": question,
             "answer": answer,
             "context": context,
             "relevant_documents": [doc.to_dict() for doc in relevant_docs],
-            "confidence": confidence
+            "confidence": self._calculate_confidence(relevant_docs)
         }
 
     def _generate_answer(
@@ -351,16 +735,47 @@ class RAGSystem:
         relevant_docs: List[SearchResult]
     ) -> str:
         """生成答案"""
-        # 如果有 LLM，使用 LLM 生成答案
-        if self.llm is not None:
-            try:
-                # 记录调试信息
-                logger.info(f"生成答案 - 问题: {question}")
-                logger.info(f"检索到 {len(relevant_docs)} 个相关文档")
-                logger.info(f"上下文长度: {len(context)} 字符")
-
-                # 构建提示
-                prompt = f"""你是一个专业的文档总结助手。请基于提供的上下文信息回答问题。
+        # 没有 LLM 时使用演示实现
+        if self.llm is None:
+            return self._fallback_answer(context, relevant_docs)
+
+        try:
+            prompt = self._build_prompt(question, context, relevant_docs)
+            return self._extract_answer(self.llm.invoke(prompt))
+        except Exception as e:
+            logger.error(f"LLM 生成答案失败: {str(e)}")
+            return self._fallback_answer(context, relevant_docs, error=e)
+
+    async def _agenerate_answer(
+        self,
+        question: str,
+        context: str,
+        relevant_docs: List[SearchResult]
+    ) -> str:
+        """异步生成答案"""
+        if self.llm is None:
+            return self._fallback_answer(context, relevant_docs)
+
+        try:
+            prompt = self._build_prompt(question, context, relevant_docs)
+            if hasattr(self.llm, 'ainvoke'):
+                response = await self.llm.ainvoke(prompt)
+            else:
+                response = await asyncio.to_thread(self.llm.invoke, prompt)
+            return self._extract_answer(response)
+        except Exception as e:
+            logger.error(f"LLM 生成答案失败: {str(e)}")
+            return self._fallback_answer(context, relevant_docs, error=e)
+
+    @staticmethod
+    def _build_prompt(question: str, context: str, relevant_docs: List[SearchResult]) -> str:
+        """构建 LLM 提示"""
+        # 记录调试信息
+        logger.info(f"生成答案 - 问题: {question}")
+        logger.info(f"检索到 {len(relevant_docs)} 个相关文档")
+        logger.info(f"上下文长度: {len(context)} 字符")
+
+        prompt = f"""你是一个专业的文档总结助手。请基于提供的上下文信息回答问题。
 
 重要说明：
 1. 只使用上下文信息中的内容回答问题
@@ -374,39 +789,42 @@ class RAGSystem:
 
 回答："""
 
-                # 记录提示内容（前200字符）
-                logger.info(f"提示内容（前200字符）: {prompt[:200]}...")
-
-                # 调用 LLM 生成答案
-                response = self.llm.invoke(prompt)
-
-                # 获取答案内容
-                if hasattr(response, 'content'):
-                    answer = response.content
-                elif isinstance(response, dict) and 'content' in response:
-                    answer = response['content']
-                else:
-                    answer = str(response)
+        # 记录提示内容（前200字符）
+        logger.info(f"提示内容（前200字符）: {prompt[:200]}...")
+        return prompt
+
+    @staticmethod
+    def _extract_answer(response: Any) -> str:
+        """从 LLM 响应中提取答案内容"""
+        if hasattr(response, 'content'):
+            answer = response.content
+        elif isinstance(response, dict) and 'content' in response:
+            answer = response['content']
+        else:
+            answer = str(response)
 
-                logger.info(f"LLM 回答长度: {len(answer)} 字符")
-                logger.info(f"LLM 回答: {answer[:200]}...")
+        logger.info(f"LLM 回答长度: {len(answer)} 字符")
+        logger.info(f"LLM 回答: {answer[:200]}...")
 
-                return answer.strip()
+        return answer.strip()
 
-            except Exception as e:
-                logger.error(f"LLM 生成答案失败: {str(e)}")
-                # LLM 失败时回退到演示实现
-                return f"""
+    @staticmethod
+    def _fallback_answer(
+        context: str,
+        relevant_docs: List[SearchResult],
+        error: Optional[Exception] = None
+    ) -> str:
+        """没有 LLM 或 LLM 调用失败时的演示答案"""
+        if error is not None:
+            return f"""
 基于以下 {len(relevant_docs)} 个相关文档片段的回答：
 
 {context[:500]}...
 
 注意：LLM 调用失败，使用演示版本。
-错误信息：{str(e)}
+错误信息：{str(error)}
 """
-        else:
-            # 没有 LLM 时使用演示实现
-            return f"""
+        return f"""
 基于以下 {len(relevant_docs)} 个相关文档片段的回答：
 
 {context[:500]}...
@@ -436,6 +854,15 @@ class RAGSystem:
         """批量查询"""
         return [self.query(q, k=k, filter=filter) for q in questions]
 
+    async def abatch_query(
+        self,
+        questions: List[str],
+        k: int = 5,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """异步批量查询（并发调用 LLM）"""
+        return await asyncio.gather(*(self.aquery(q, k=k, filter=filter) for q in questions))
+
     def get_relevant_docs(
         self,
         question: str,
@@ -452,6 +879,8 @@ class RAGSystem:
     def load(self, path: str):
         """加载 RAG 系统"""
         self.vector_store.load(path)
+        if self.cache is not None:
+            self.cache.clear()
 
 
 class HybridSearch:
@@ -459,6 +888,25 @@ class HybridSearch:
 
     def __init__(self, vector_store: BaseVectorStore):
         self.vector_store = vector_store
+        # 关键词倒排索引：词 -> 包含该词的文档下标（按下标递增）
+        self._index: Dict[str, List[int]] = defaultdict(list)
+        self._indexed_docs: Optional[List[Any]] = None
+        self._indexed_count = 0
+
+    def _update_index(self):
+        """同步倒排索引：新增文档增量索引，文档列表被替换或缩短时重建"""
+        docs = self.vector_store.documents
+        if docs is not self._indexed_docs or len(docs) < self._indexed_count:
+            self._index = defaultdict(list)
+            self._indexed_docs = docs
+            self._indexed_count = 0
+
+        for i in range(self._indexed_count, len(docs)):
+            doc = docs[i]
+            content = doc.content if hasattr(doc, 'content') else str(doc)
+            for term in set(content.lower().split()):
+                self._index[term].append(i)
+        self._indexed_count = len(docs)
 
     def search(
         self,
@@ -474,57 +922,48 @@ class HybridSearch:
         # 2. 关键词搜索（简化版）
         keyword_results = self._keyword_search(query, k=k*2)
 
-        # 3. 合并结果
-        combined_scores = {}
-        for i, doc in enumerate(vector_results):
-            doc_id = i
-            combined_scores[doc_id] = combined_scores.get(doc_id, 0) + doc.score * vector_weight
-
-        for i, doc in enumerate(keyword_results):
-            doc_id = i + len(vector_results)
-            combined_scores[doc_id] = combined_scores.get(doc_id, 0) + doc.score * keyword_weight
-
-        # 4. 排序
-        all_results = vector_results + keyword_results
-        sorted_results = sorted(
-            [(i, score) for i, score in combined_scores.items()],
-            key=lambda x: x[1],
-            reverse=True
-        )
-
-        # 5. 返回 top-k
-        results = []
-        for doc_id, score in sorted_results[:k]:
-            if doc_id < len(vector_results):
-                results.append(vector_results[doc_id])
-            else:
-                results.append(keyword_results[doc_id - len(vector_results)])
+        # 3. 合并结果：按文档去重（字典保持插入顺序），同一文档的两路分数相加
+        combined: Dict[int, List[Any]] = {}
+        for weight, hits in ((vector_weight, vector_results), (keyword_weight, keyword_results)):
+            for hit in hits:
+                entry = combined.get(id(hit.document))
+                if entry is None:
+                    combined[id(hit.document)] = [hit.score * weight, hit]
+                else:
+                    entry[0] += hit.score * weight
 
-        return results
+        # 4. 选出 top-k 并返回
+        return [hit for _, hit in heapq.nlargest(k, combined.values(), key=itemgetter(0))]
 
     def _keyword_search(self, query: str, k: int) -> List[SearchResult]:
-        """简单的关键词搜索"""
+        """简单的关键词搜索（基于倒排索引，只访问包含查询词的文档）"""
         query_terms = set(query.lower().split())
+        if not query_terms:
+            return []
+
+        self._update_index()
+
+        # 计算关键词匹配度：每个文档命中的查询词数
+        matches: Dict[int, int] = defaultdict(int)
+        for term in query_terms:
+            for i in self._index.get(term, ()):
+                matches[i] += 1
+
+        # 先按命中数选出 top-k（同分时下标小者优先），只为入选文档构建结果
+        top = heapq.nlargest(k, matches.items(), key=lambda item: (item[1], -item[0]))
+
+        docs = self.vector_store.documents
         results = []
+        for i, hits in top:
+            doc = docs[i]
+            results.append(SearchResult(
+                document=doc,
+                score=hits / len(query_terms),
+                metadata=doc.metadata if hasattr(doc, 'metadata') else {},
+                source=doc.metadata.get('source', 'unknown') if hasattr(doc, 'metadata') else 'unknown'
+            ))
 
-        for i, doc in enumerate(self.vector_store.documents):
-            content = doc.content if hasattr(doc, 'content') else str(doc)
-            content_terms = set(content.lower().split())
-
-            # 计算关键词匹配度
-            matches = len(query_terms.intersection(content_terms))
-            if matches > 0:
-                score = matches / len(query_terms)
-                results.append(SearchResult(
-                    document=doc,
-                    score=score,
-                    metadata=doc.metadata if hasattr(doc, 'metadata') else {},
-                    source=doc.metadata.get('source', 'unknown') if hasattr(doc, 'metadata') else 'unknown'
-                ))
-
-        # 按分数排序
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results[:k]
+        return results
 
 
 # 使用示例
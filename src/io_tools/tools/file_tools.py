@@ -6,6 +6,7 @@
 from langchain.tools import tool
 from langchain_core.tools import ToolException
 import os
+import stat
 import sys
 
 # 添加 src 目录到路径以导入 security
@@ -99,11 +100,12 @@ def read_file_tool(path: str) -> str:
         # 使用 realpath 获取实际路径（已经通过安全验证，不需要 sanitize）
         real_path = os.path.realpath(path)
 
+        # 4. 限制读取大小：最多读 max_read_size + 1 个字符，足以判断是否需要截断，
+        #    大文件不会被整个读入内存
+        max_read_size = SecurityValidator._get_max_read_size()
         with open(real_path, "r", encoding='utf-8') as f:
-            content = f.read()
+            content = f.read(max_read_size + 1)
 
-        # 4. 限制读取大小
-        max_read_size = SecurityValidator._get_max_read_size()
         if len(content) > max_read_size:
             content = content[:max_read_size] + "\n... (文件过大，已截断)"
 
@@ -137,10 +139,13 @@ def list_files_tool(directory: str = ".") -> str:
         # 使用 realpath 获取实际路径，不使用 sanitize_filename
         real_path = os.path.realpath(directory)
 
-        if not os.path.exists(real_path):
+        # 一次 stat 同时判断是否存在和是否为目录
+        try:
+            st = os.stat(real_path)
+        except FileNotFoundError:
             raise SecurityToolException(f"目录 '{directory}' 不存在")
 
-        if not os.path.isdir(real_path):
+        if not stat.S_ISDIR(st.st_mode):
             raise SecurityToolException(f"'{directory}' 不是一个目录")
 
         files = os.listdir(real_path)
@@ -178,10 +183,13 @@ def delete_file_tool(path: str) -> str:
         # 使用 realpath 获取实际路径（已经通过安全验证，不需要 sanitize）
         real_path = os.path.realpath(path)
 
-        if not os.path.exists(real_path):
+        # 一次 stat 同时判断是否存在和是否为目录
+        try:
+            st = os.stat(real_path)
+        except FileNotFoundError:
             raise SecurityToolException(f"文件 '{path}' 不存在")
 
-        if os.path.isdir(real_path):
+        if stat.S_ISDIR(st.st_mode):
             raise SecurityToolException(f"'{path}' 是一个目录，不能使用删除文件工具")
 
         os.remove(real_path)
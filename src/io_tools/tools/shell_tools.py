@@ -7,6 +7,7 @@ from langchain.tools import tool
 from langchain_core.tools import ToolException
 import subprocess
 import os
+import stat
 import sys
 
 # 添加 src 目录到路径以导入 security
@@ -106,10 +107,13 @@ def list_directory_tool(directory: str = ".") -> str:
         # 使用 realpath 获取实际路径，不使用 sanitize_filename
         real_path = os.path.realpath(directory)
 
-        if not os.path.exists(real_path):
+        # 一次 stat 同时判断是否存在和是否为目录
+        try:
+            st = os.stat(real_path)
+        except FileNotFoundError:
             raise ShellCommandException(f"目录 '{directory}' 不存在")
 
-        if not os.path.isdir(real_path):
+        if not stat.S_ISDIR(st.st_mode):
             raise ShellCommandException(f"'{directory}' 不是一个目录")
 
         files = os.listdir(real_path)
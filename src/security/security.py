@@ -7,24 +7,112 @@
 import os
 import re
 import json
-from typing import Dict, Any, Tuple, List, Optional
+from typing import Callable, Dict, Any, Tuple, List, Optional
 from pathlib import Path
+from functools import lru_cache
+
+from common.json_utils import json_loads
+
+# 用于从文本中提取首个 JSON 对象
+_JSON_DECODER = json.JSONDecoder()
+
+# 配置查找缓存中表示“键不存在”的标记
+_MISSING = object()
+
+
+@lru_cache(maxsize=32)
+def _resolve_directories(dirs: Tuple[str, ...]) -> Tuple[str, ...]:
+    """解析配置目录的真实路径（结果缓存，避免每次路径验证重复 realpath）"""
+    return tuple(os.path.realpath(d) for d in dirs)
+
+
+@lru_cache(maxsize=8)
+def _compile_prefix_matcher(dirs: Tuple[str, ...]) -> Optional["re.Pattern"]:
+    """将目录列表编译为一个锚定的前缀正则，一次匹配即可判断路径是否位于其中任一目录
+
+    Args:
+        dirs: 已解析为真实路径的目录元组
+
+    Returns:
+        预编译正则（匹配目录本身或其子路径）；目录为空时返回 None
+    """
+    if not dirs:
+        return None
+    # 较长的前缀排在前面，使匹配结果落在最具体的目录上
+    alternatives = "|".join(re.escape(d) for d in sorted(dirs, key=len, reverse=True))
+    # 用 \Z 而不是 $：$ 也会在末尾换行符之前匹配，"/etc\n" 会被误判为 /etc
+    return re.compile(f"(?:{alternatives})(?:{re.escape(os.sep)}|\\Z)")
+
+
+@lru_cache(maxsize=8)
+def _compile_literal_union(literals: Tuple[str, ...]) -> Optional["re.Pattern"]:
+    """将多个字面字符串合并为一个预编译正则，一次扫描即可判断文本是否包含其中任一个
+
+    Args:
+        literals: 字符串元组
+
+    Returns:
+        合并后的正则；为空时返回 None
+    """
+    if not literals:
+        return None
+    return re.compile("|".join(re.escape(c) for c in literals))
+
+
+@lru_cache(maxsize=8)
+def _compile_pattern_union(patterns: Tuple[str, ...]) -> Optional["re.Pattern"]:
+    """将多个正则合并为一个预编译的选择分支，一次扫描即可判断是否命中
+
+    含捕获组的模式不合并：合并后组号整体偏移，\\1 之类的反向引用会指向
+    其他模式的组，可能漏判危险输入，此时由调用方逐个匹配。
+
+    Args:
+        patterns: 正则表达式元组
+
+    Returns:
+        合并后的正则；为空、含捕获组或无法合并时返回 None
+    """
+    if not patterns:
+        return None
+    try:
+        if any(re.compile(p).groups for p in patterns):
+            return None
+        return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+    except re.error:
+        return None
 
 
 class SecurityConfig:
     """安全配置管理器"""
 
     _config = None
+    # 点分隔键 -> 查找结果（每次校验都会多次读取配置，避免重复拆分和逐层查找）
+    _lookup_cache: Dict[str, Any] = {}
+    # 配置重新加载后调用的回调（用于清空依赖配置的外部缓存）
+    _reload_callbacks: List[Callable[[], None]] = []
+
+    @classmethod
+    def on_reload(cls, callback: Callable[[], None]):
+        """注册配置重新加载回调
+
+        Args:
+            callback: 无参回调，每次 load_config 完成后调用
+        """
+        cls._reload_callbacks.append(callback)
 
     @classmethod
     def load_config(cls, config_path: str = "config/config.json"):
         """加载配置文件"""
+        cls._lookup_cache = {}
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                cls._config = json.load(f)
+            # orjson 可用时加速解析，行为与标准库不一致的输入自动回退
+            with open(config_path, 'rb') as f:
+                cls._config = json_loads(f.read())
         except Exception as e:
             print(f"Warning: Failed to load config: {e}")
             cls._config = {}
+        for callback in cls._reload_callbacks:
+            callback()
 
     @classmethod
     def get(cls, key: str, default: Any = None) -> Any:
@@ -32,14 +120,18 @@ class SecurityConfig:
         if cls._config is None:
             cls.load_config()
 
-        keys = key.split('.')
-        value = cls._config
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        return value
+        try:
+            value = cls._lookup_cache[key]
+        except KeyError:
+            value = cls._config
+            for k in key.split('.'):
+                if isinstance(value, dict) and k in value:
+                    value = value[k]
+                else:
+                    value = _MISSING
+                    break
+            cls._lookup_cache[key] = value
+        return default if value is _MISSING else value
 
     @classmethod
     def get_security_config(cls) -> Dict[str, Any]:
@@ -59,19 +151,19 @@ class SecurityValidator:
     def _get_allowed_base_dir(cls) -> str:
         """获取允许的基础目录"""
         base_dir = SecurityConfig.get("security.base_directory", os.path.dirname(__file__))
-        return os.path.realpath(base_dir)
+        return _resolve_directories((base_dir,))[0]
 
     @classmethod
-    def _get_allowed_directories(cls) -> List[str]:
+    def _get_allowed_directories(cls) -> Tuple[str, ...]:
         """获取允许的目录列表"""
         dirs = SecurityConfig.get("security.allowed_directories", [])
-        return [os.path.realpath(d) for d in dirs]
+        return _resolve_directories(tuple(dirs))
 
     @classmethod
-    def _get_blocked_directories(cls) -> List[str]:
+    def _get_blocked_directories(cls) -> Tuple[str, ...]:
         """获取禁止的目录列表"""
         dirs = SecurityConfig.get("security.blocked_directories", [])
-        return [os.path.realpath(d) for d in dirs]
+        return _resolve_directories(tuple(dirs))
 
     @classmethod
     def _get_allowed_commands(cls) -> Dict[str, List[str]]:
@@ -88,6 +180,50 @@ class SecurityValidator:
         """获取危险模式列表"""
         return SecurityConfig.get("security.dangerous_patterns", [])
 
+    @classmethod
+    def _find_dangerous_pattern(cls, text: str) -> Optional[str]:
+        """查找文本命中的第一个危险模式
+
+        先用合并后的正则单次扫描，只有命中时才逐个定位具体模式。
+
+        Args:
+            text: 待检查文本
+
+        Returns:
+            命中的模式，未命中返回 None
+        """
+        patterns = tuple(cls._get_dangerous_patterns())
+        union = _compile_pattern_union(patterns)
+        if union is not None and not union.search(text):
+            return None
+
+        for pattern in patterns:
+            if re.search(pattern, text, re.IGNORECASE):
+                return pattern
+        return None
+
+    @classmethod
+    def _find_blocked_char(cls, text: str, chars: Tuple[str, ...]) -> Optional[str]:
+        """查找文本包含的第一个禁止字符（按列表顺序）
+
+        先用合并后的正则单次扫描，只有命中时才逐个定位具体字符。
+
+        Args:
+            text: 待检查文本
+            chars: 禁止字符元组
+
+        Returns:
+            命中的字符，未命中返回 None
+        """
+        union = _compile_literal_union(chars)
+        if union is None or not union.search(text):
+            return None
+
+        for char in chars:
+            if char in text:
+                return char
+        return None
+
     @classmethod
     def _get_max_input_length(cls) -> int:
         """获取最大输入长度"""
@@ -169,26 +305,21 @@ class SecurityValidator:
         # 规范化路径
         try:
             real_path = os.path.realpath(path)
-            base_path = os.path.realpath(cls._get_allowed_base_dir())
+            base_path = cls._get_allowed_base_dir()
 
             # 检查是否在允许目录内
             allowed_dirs = cls._get_allowed_directories()
             blocked_dirs = cls._get_blocked_directories()
 
             # 首先检查是否在禁止目录内
-            for blocked_dir in blocked_dirs:
-                if real_path.startswith(blocked_dir + os.sep) or real_path == blocked_dir:
-                    return False, f"路径在禁止目录内: {path}"
+            blocked_matcher = _compile_prefix_matcher(blocked_dirs)
+            if blocked_matcher is not None and blocked_matcher.match(real_path):
+                return False, f"路径在禁止目录内: {path}"
 
             # 检查目录白名单模式
             if cls._is_directory_whitelist_mode():
-                is_allowed = False
-                for allowed_dir in allowed_dirs:
-                    if real_path.startswith(allowed_dir + os.sep) or real_path == allowed_dir:
-                        is_allowed = True
-                        break
-
-                if not is_allowed:
+                allowed_matcher = _compile_prefix_matcher(allowed_dirs)
+                if allowed_matcher is None or not allowed_matcher.match(real_path):
                     return False, f"路径不在允许目录内: {path}"
             else:
                 # 黑名单模式：检查是否在基础目录内
@@ -236,16 +367,14 @@ class SecurityValidator:
             return False, f"命令过长 (最大 {max_length} 字符)"
 
         # 检查危险模式
-        dangerous_patterns = cls._get_dangerous_patterns()
-        for pattern in dangerous_patterns:
-            if re.search(pattern, cmd, re.IGNORECASE):
-                return False, f"命令包含危险模式: {pattern}"
+        pattern = cls._find_dangerous_pattern(cmd)
+        if pattern is not None:
+            return False, f"命令包含危险模式: {pattern}"
 
         # 检查禁止的字符
-        blocked_chars = cls._get_blocked_chars()
-        for char in blocked_chars:
-            if char in cmd:
-                return False, f"命令包含危险字符: {char}"
+        char = cls._find_blocked_char(cmd, tuple(cls._get_blocked_chars()))
+        if char is not None:
+            return False, f"命令包含危险字符: {char}"
 
         # 检查命令白名单
         parts = cmd.split()
@@ -291,19 +420,15 @@ class SecurityValidator:
             Tuple[bool, str, Dict]: (是否安全, 错误信息, 工具调用字典)
         """
         try:
-            # 提取 JSON
-            json_match = re.search(r'```json\s*(\{.*?\})\s*```', content, re.DOTALL)
-            if not json_match:
-                json_match = re.search(r'(\{.*\})', content, re.DOTALL)
-
-            if not json_match:
+            # 定位 JSON 起点（优先 ```json 代码块内的对象）
+            fence = content.find('```json')
+            start = content.find('{', fence + 7 if fence != -1 else 0)
+            if start == -1:
                 return False, "未找到 JSON", {}
 
-            json_str = json_match.group(1)
-
-            # 解析 JSON
+            # 从起点直接解码第一个完整对象，忽略其后的文本
             try:
-                tool_call = json.loads(json_str)
+                tool_call, _ = _JSON_DECODER.raw_decode(content, start)
             except json.JSONDecodeError as e:
                 return False, f"JSON 格式错误: {str(e)}", {}
 
@@ -396,23 +521,20 @@ class SecurityValidator:
         # 特殊命令检查 - 以!开头的命令是允许的
         if user_input.strip().startswith("!"):
             # 特殊命令只需要检查长度和危险模式，不需要检查危险字符
-            dangerous_patterns = cls._get_dangerous_patterns()
-            for pattern in dangerous_patterns:
-                if re.search(pattern, user_input, re.IGNORECASE):
-                    return False, f"输入包含危险模式: {pattern}"
+            pattern = cls._find_dangerous_pattern(user_input)
+            if pattern is not None:
+                return False, f"输入包含危险模式: {pattern}"
             return True, "安全"
 
         # 检查危险模式（这是主要的验证）
-        dangerous_patterns = cls._get_dangerous_patterns()
-        for pattern in dangerous_patterns:
-            if re.search(pattern, user_input, re.IGNORECASE):
-                return False, f"输入包含危险模式: {pattern}"
+        pattern = cls._find_dangerous_pattern(user_input)
+        if pattern is not None:
+            return False, f"输入包含危险模式: {pattern}"
 
         # 只检查非常危险的字符（不检查常见字符如括号、方括号等）
-        extremely_dangerous_chars = ["`", "$", "\\", "<", ">"]
-        for char in extremely_dangerous_chars:
-            if char in user_input:
-                return False, f"输入包含危险字符: {char}"
+        char = cls._find_blocked_char(user_input, ("`", "$", "\\", "<", ">"))
+        if char is not None:
+            return False, f"输入包含危险字符: {char}"
 
         return True, "安全"
 
@@ -19,18 +19,133 @@ def test_data_loaders():
     assert d.content == 'test'
     print("✅ 数据加载器测试通过")
 
+def test_document_cache():
+    """测试文档磁盘缓存"""
+    import tempfile
+    from core.data_loaders import Document, DocumentCache
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = DocumentCache(cache_dir=os.path.join(tmp, 'cache'))
+        path = os.path.join(tmp, 'a.txt')
+        with open(path, 'w') as f:
+            f.write('hello')
+        assert cache.get(path) is None
+        cache.set(path, [Document('hello', source=path)])
+        assert cache.get(path)[0].content == 'hello'
+        with open(path, 'w') as f:
+            f.write('changed')
+        assert cache.get(path) is None
+
+        # 无法序列化的文档不写入缓存，也不留下临时文件
+        cache.set(path, [Document('x', source=path, metadata={'f': lambda: None})])
+        assert cache.get(path) is None
+        assert not any(name.endswith('.tmp') for name in os.listdir(cache.cache_dir))
+
+        # 加载器设置参与缓存键，命中时源路径按本次调用改写
+        from core.data_loaders import JSONLoader, TextFileLoader
+        path = os.path.join(tmp, 'a.json')
+        with open(path, 'w') as f:
+            f.write('{"content": "c", "title": "t"}')
+        loader = JSONLoader()
+        loader.cache = cache
+        assert loader.load_cached(path)[0].content == 'c'
+        other = JSONLoader(text_fields=['title'])
+        other.cache = cache
+        assert other.load_cached(path)[0].content == 't'
+        alias = os.path.join(tmp, '.', 'a.json')
+        doc = loader.load_cached(alias)[0]
+        assert doc.source == alias and doc.metadata['source'] == alias
+        text_loader = TextFileLoader(metadata_extractors={'n': lambda p, c: len(c)})
+        text_loader.cache = cache
+        assert text_loader._cache_settings() is None
+        assert text_loader.load_cached(path)[0].metadata['n'] == len('{"content": "c", "title": "t"}')
+    print("✅ 文档缓存测试通过")
+
+def test_directory_loader():
+    """测试目录并行加载"""
+    import tempfile
+    from core.data_loaders import DirectoryLoader
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(6):
+            with open(os.path.join(tmp, f'{i}.txt'), 'w') as f:
+                f.write(f'doc {i}')
+        with open(os.path.join(tmp, 'skip.bin'), 'w') as f:
+            f.write('x')
+        docs = DirectoryLoader(max_workers=3).load(tmp)
+        assert sorted(d.content for d in docs) == [f'doc {i}' for i in range(6)]
+    print("✅ 目录加载测试通过")
+
 def test_vector_store():
     """测试向量存储"""
     from core.vector_store import InMemoryVectorStore
+    from core.data_loaders import Document
     v = InMemoryVectorStore()
     assert v.documents == []
+    v.add([Document('abc', source='a'), Document('de', source='b')])
+    assert v.get_stats()['total_characters'] == 5
+    v.delete([0])
+    assert v.get_stats()['total_characters'] == 2
     print("✅ 向量存储测试通过")
 
+def test_hybrid_search():
+    """测试混合搜索结果去重"""
+    from core.vector_store import InMemoryVectorStore, HybridSearch
+    from core.data_loaders import Document
+    v = InMemoryVectorStore()
+    v.add([Document('python file tools', source='a'), Document('shell command runner', source='b'),
+           Document('python shell', source='c')])
+    results = HybridSearch(v).search('python shell', k=3)
+    assert len({id(r.document) for r in results}) == len(results) == 3
+    assert results[0].document.content == 'python shell'
+    print("✅ 混合搜索测试通过")
+
+def test_proximity_cache():
+    """测试近似查询缓存"""
+    from core.vector_store import ProximityCache
+    c = ProximityCache(capacity=2, tolerance=0.05)
+    c.insert([1.0, 0.0], "a")
+    assert c.lookup([0.999, 0.01]) == "a"
+    assert c.lookup([0.0, 1.0]) is None
+    c.insert([0.0, 1.0], "b")
+    c.insert([1.0, 1.0], "c")
+    assert len(c) == 2
+    print("✅ 近似查询缓存测试通过")
+
+def test_query_cache():
+    """测试非语义嵌入下按问题文本精确缓存"""
+    from core.vector_store import InMemoryVectorStore, RAGSystem, ProximityCache, QueryCache
+    from core.data_loaders import Document
+    v = InMemoryVectorStore()
+    v.add([Document('the service is running', source='a')])
+    rag = RAGSystem(v, cache=ProximityCache())
+    assert isinstance(rag.cache, QueryCache)
+    rag.query('is the service running')
+    rag.query('is the server running')
+    assert len(rag.cache) == 2
+    assert rag.query('Is  the SERVICE running')['question'] == 'Is  the SERVICE running'
+    assert len(rag.cache) == 2
+
+    # 异步查询在线程池中检索，缓存仍然生效
+    import asyncio
+    import threading
+    threads = []
+    retrieve = rag._retrieve
+    def record_retrieve(*args):
+        threads.append(threading.current_thread())
+        return retrieve(*args)
+    rag._retrieve = record_retrieve
+    assert asyncio.run(rag.aquery('is the service up'))['question'] == 'is the service up'
+    assert threads and threads[0] is not threading.main_thread()
+    asyncio.run(rag.aquery('is the service up'))
+    assert len(threads) == 1
+    print("✅ 精确查询缓存测试通过")
+
 def test_output_parsers():
     """测试输出解析器"""
     from core.output_parsers import parse_output
     r = parse_output('{"a":1}', 'json')
     assert r.data['a'] == 1
+    r = parse_output('调用 {"x": 1} 然后 {"name": "t", "arguments": {"k": {"n": 1}}}', 'tool_call')
+    assert r.data == {"name": "t", "arguments": {"k": {"n": 1}}}
     print("✅ 输出解析器测试通过")
 
 def test_chains():
@@ -44,7 +159,12 @@ if __name__ == "__main__":
     print("运行单元测试...")
     test_prompts()
     test_data_loaders()
+    test_document_cache()
+    test_directory_loader()
     test_vector_store()
+    test_hybrid_search()
+    test_proximity_cache()
+    test_query_cache()
     test_output_parsers()
     test_chains()
     print("\n✅ 所有单元测试通过！")
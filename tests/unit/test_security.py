@@ -0,0 +1,64 @@
+"""安全模块单元测试
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+def test_validate_tool_call():
+    """测试工具调用 JSON 提取"""
+    from security.security import SecurityValidator
+    content = '好的\n```json\n{"name": "get_working_directory_tool", "arguments": {}}\n```\n完成'
+    is_safe, _, tool_call = SecurityValidator.validate_tool_call(content)
+    assert is_safe and tool_call["name"] == "get_working_directory_tool"
+    assert SecurityValidator.validate_tool_call("没有 JSON")[1] == "未找到 JSON"
+    assert not SecurityValidator.validate_tool_call("{bad}")[0]
+    print("✅ 工具调用解析测试通过")
+
+def test_dangerous_patterns():
+    """测试危险模式检测"""
+    from security.security import SecurityValidator
+    assert SecurityValidator.validate_user_input("你好")[0]
+    is_safe, error = SecurityValidator.validate_user_input("please SUDO ls")
+    assert not is_safe and "sudo" in error
+    print("✅ 危险模式检测测试通过")
+
+def test_prefix_matcher():
+    """测试目录前缀匹配"""
+    from security.security import _compile_prefix_matcher
+    matcher = _compile_prefix_matcher(('/etc', '/usr/lib'))
+    assert matcher.match('/etc') and matcher.match('/etc/passwd')
+    assert matcher.match('/usr/lib/x') and not matcher.match('/usr/libexec')
+    assert not matcher.match('/etcetera') and not matcher.match('/home/etc')
+    assert not matcher.match('/etc\n') and not matcher.match('/usr/lib\n')
+    assert _compile_prefix_matcher(()) is None
+    print("✅ 目录前缀匹配测试通过")
+
+def test_pattern_union():
+    """测试危险模式合并（含捕获组时不合并）"""
+    from security.security import _compile_pattern_union
+    union = _compile_pattern_union(('sudo', 'rm -rf'))
+    assert union.search('x SUDO y') and not union.search('ls')
+    assert _compile_pattern_union(('a(b)', r'(c)\1')) is None
+    print("✅ 危险模式合并测试通过")
+
+def test_config_reload_callback():
+    """测试配置重新加载回调"""
+    from security.security import SecurityConfig
+    calls = []
+    SecurityConfig.on_reload(lambda: calls.append(1))
+    try:
+        SecurityConfig.load_config()
+        assert calls == [1]
+    finally:
+        SecurityConfig._reload_callbacks.pop()
+    print("✅ 配置重新加载回调测试通过")
+
+if __name__ == "__main__":
+    print("运行单元测试...")
+    test_validate_tool_call()
+    test_dangerous_patterns()
+    test_prefix_matcher()
+    test_pattern_union()
+    test_config_reload_callback()
+    print("\n✅ 所有单元测试通过！")
@@ -0,0 +1,200 @@
+"""实用工具单元测试
+"""
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+def test_math_describe():
+    """测试基础统计量"""
+    from common.utilities.math_utils import MathUtils
+    r = MathUtils.describe([3, 1, 4, 1, 5])
+    assert r['count'] == 5 and r['sum'] == 14
+    assert r['min'] == 1 and r['max'] == 5
+    assert r['mean'] == 2.8
+    # 大数组（可能走 numpy 路径）：求和不溢出，min/max 保持原始类型
+    from common.utilities.math_utils import NUMPY_MIN_SIZE
+    r = MathUtils.describe([2 ** 62] * NUMPY_MIN_SIZE)
+    assert r['sum'] == float(2 ** 62) * NUMPY_MIN_SIZE
+    r = MathUtils.describe([1.5] * NUMPY_MIN_SIZE + [1])
+    assert r['min'] == 1 and type(r['min']) is int and type(r['max']) is float
+    print("✅ 数学工具测试通过")
+
+def test_remove_html_tags():
+    """测试HTML标签去除"""
+    from common.utilities.text_utils import TextUtils
+    assert TextUtils.remove_html_tags('<p>a &amp; b</p>') == 'a & b'
+    assert TextUtils.remove_html_tags('1 &lt;b&gt; 2') == '1 <b> 2'
+    assert TextUtils.remove_html_tags('plain') == 'plain'
+    print("✅ HTML标签去除测试通过")
+
+def test_copy_file():
+    """测试文件复制"""
+    from common.utilities.file_utils import FileUtils
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'a.txt')
+        FileUtils.write_file(src, 'hello' * 1000)
+        dst = os.path.join(tmp, 'sub', 'b.txt')
+        FileUtils.copy_file(src, dst)
+        assert FileUtils.read_file(dst) == 'hello' * 1000
+        assert os.stat(src).st_mtime == os.stat(dst).st_mtime
+    print("✅ 文件复制测试通过")
+
+def test_count_lines():
+    """测试文件行数统计"""
+    from common.utilities.file_utils import FileUtils
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'a.txt')
+        for content, expected in [('', 0), ('a', 1), ('a\nb\n', 2), ('a\nb', 2)]:
+            FileUtils.write_file(path, content)
+            assert FileUtils.count_lines(path, chunk_size=1) == expected
+    print("✅ 行数统计测试通过")
+
+def test_read_lines():
+    """测试按行读取"""
+    from common.utilities.file_utils import FileUtils
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'a.txt')
+        FileUtils.write_file(path, ''.join(f'{i}\n' for i in range(10)))
+        assert FileUtils.read_lines(path, start=2, count=3) == ['2\n', '3\n', '4\n']
+        assert len(FileUtils.read_lines(path, start=8)) == 2
+        assert FileUtils.read_lines(path, start=20, count=5) == []
+    print("✅ 按行读取测试通过")
+
+def test_write_json():
+    """测试JSON写入与标准库输出一致"""
+    import json
+    from common.utilities.file_utils import FileUtils
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'a.json')
+        for data in ({'a': [1, 0.5, '中文'], 'b': {'c': None}},
+                     {'small': 1e-05, 'big': 1e16, 'nan': [float('nan'), float('inf')]}):
+            FileUtils.write_json(path, data)
+            with open(path, encoding='utf-8') as f:
+                assert f.read() == json.dumps(data, indent=2, ensure_ascii=False)
+
+        # 标准库无法序列化的类型照常报错，不由 orjson 自行序列化
+        import datetime
+        import uuid
+        for value in (datetime.date(2024, 1, 1), uuid.uuid4()):
+            try:
+                FileUtils.write_json(path, {'v': value})
+                assert False, value
+            except TypeError:
+                pass
+    print("✅ JSON写入测试通过")
+
+def test_read_json():
+    """测试JSON读取与标准库解析一致"""
+    import math
+    from common.utilities.file_utils import FileUtils
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'a.json')
+        FileUtils.write_json(path, {'x': float('nan'), 'big': 2 ** 70, 'id': '12345678901234567890'})
+        data = FileUtils.read_json(path)
+        assert math.isnan(data['x']) and data['big'] == 2 ** 70
+        assert data['id'] == '12345678901234567890'
+    print("✅ JSON读取测试通过")
+
+def test_file_hash():
+    """测试文件哈希"""
+    import hashlib
+    from common.utilities.file_utils import FileUtils
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'a.bin')
+        data = os.urandom(10000)
+        with open(path, 'wb') as f:
+            f.write(data)
+        assert FileUtils.calculate_md5(path, chunk_size=4096) == hashlib.md5(data).hexdigest()
+        assert FileUtils.calculate_sha256(path) == hashlib.sha256(data).hexdigest()
+    print("✅ 文件哈希测试通过")
+
+def test_copy_directory():
+    """测试目录复制"""
+    from common.utilities.file_utils import FileUtils
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'src')
+        for i in range(5):
+            FileUtils.write_file(os.path.join(src, 'sub', f'{i}.txt'), str(i))
+        FileUtils.write_file(os.path.join(src, 'top.txt'), 'top')
+        dst = os.path.join(tmp, 'dst')
+        assert FileUtils.copy_directory(src, dst, max_workers=4) == 6
+        assert FileUtils.read_file(os.path.join(dst, 'sub', '3.txt')) == '3'
+        assert FileUtils.read_file(os.path.join(dst, 'top.txt')) == 'top'
+
+        # 符号链接按指向的内容复制，指向祖先目录的链接跳过
+        os.symlink(os.path.join(src, 'sub'), os.path.join(src, 'linked'))
+        os.symlink(os.path.join(src, 'top.txt'), os.path.join(src, 'top_link.txt'))
+        os.symlink(src, os.path.join(src, 'sub', 'loop'))
+        dst = os.path.join(tmp, 'dst2')
+        assert FileUtils.copy_directory(src, dst) == 12
+        assert FileUtils.read_file(os.path.join(dst, 'linked', '3.txt')) == '3'
+        assert not os.path.islink(os.path.join(dst, 'linked'))
+        assert FileUtils.read_file(os.path.join(dst, 'top_link.txt')) == 'top'
+        assert not os.path.exists(os.path.join(dst, 'sub', 'loop'))
+
+        # 兄弟目录互相链接：沿遍历路径再次遇到同一目录时跳过
+        src = os.path.join(tmp, 'mutual')
+        FileUtils.write_file(os.path.join(src, 'a', 'x.txt'), 'x')
+        FileUtils.write_file(os.path.join(src, 'b', 'y.txt'), 'y')
+        os.symlink(os.path.join(src, 'b'), os.path.join(src, 'a', 'lb'))
+        os.symlink(os.path.join(src, 'a'), os.path.join(src, 'b', 'la'))
+        dst = os.path.join(tmp, 'dst3')
+        assert FileUtils.copy_directory(src, dst) == 4
+        assert FileUtils.read_file(os.path.join(dst, 'a', 'lb', 'y.txt')) == 'y'
+        assert FileUtils.read_file(os.path.join(dst, 'b', 'la', 'x.txt')) == 'x'
+        assert not os.path.exists(os.path.join(dst, 'a', 'lb', 'la'))
+    print("✅ 目录复制测试通过")
+
+def test_url_reachable_cache():
+    """测试URL可达性缓存"""
+    from common.utilities.system_utils import SystemUtils
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = SystemUtils._url_reachable_cache
+        cache.clear()
+        missing = 'file://' + os.path.join(tmp, 'missing')
+        assert not SystemUtils.check_url_reachable(missing, cache_ttl=0)
+        assert not cache
+        size = SystemUtils.URL_REACHABLE_CACHE_SIZE
+        SystemUtils.URL_REACHABLE_CACHE_SIZE = 3
+        try:
+            for i in range(5):
+                SystemUtils.check_url_reachable(f'{missing}{i}')
+            assert list(cache) == [f'{missing}{i}' for i in (2, 3, 4)]
+        finally:
+            SystemUtils.URL_REACHABLE_CACHE_SIZE = size
+            cache.clear()
+    print("✅ URL可达性缓存测试通过")
+
+def test_memory_save_load():
+    """测试会话历史保存格式与加载"""
+    import json
+    from common.memory import ConversationMemory
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'history', 'a.json')
+        memory = ConversationMemory()
+        memory.add_message('user', '你好 \udcff')
+        memory.add_message('assistant', 'hi', name='bot')
+        memory.save_to_file(path)
+        with open(path, encoding='utf-8') as f:
+            assert f.read() == json.dumps(memory.get_messages(), indent=2)
+        loaded = ConversationMemory()
+        loaded.load_from_file(path)
+        assert loaded.get_messages() == memory.get_messages()
+    print("✅ 会话历史保存测试通过")
+
+if __name__ == "__main__":
+    print("运行单元测试...")
+    test_math_describe()
+    test_remove_html_tags()
+    test_copy_file()
+    test_copy_directory()
+    test_count_lines()
+    test_read_lines()
+    test_write_json()
+    test_read_json()
+    test_file_hash()
+    test_url_reachable_cache()
+    test_memory_save_load()
+    print("\n✅ 所有单元测试通过！")